@@ -0,0 +1,220 @@
+"""Batch simulator for tuning DIFFICULTY_SETTINGS.
+
+Fans headless games out over a multiprocessing pool and prints survival,
+level, score and accuracy distributions per setting, e.g.:
+    
+    python balance_sweep.py --games 2000 --difficulty MEDIUM HARD \\
+        --set alien_speed_mult=0.8,1.0,1.2 --set obstacle_rate=60,120
+"""
+import argparse
+import csv
+import itertools
+import multiprocessing
+import random
+import sys
+import time
+
+import numpy as np
+
+from space_invaders_game import (Game, Difficulty, DIFFICULTY_SETTINGS, INPUT_LEFT, INPUT_RIGHT, INPUT_FIRE,
+                                 TICK_RATE, WIDTH)
+
+BULLET_CENTER = 24  # Bullets leave the ship at player_x + 22 and are 4px wide
+
+# Bot policies: called once per tick with the game, return INPUT_* bits
+class IdleBot:
+    def __init__(self, seed):
+        pass
+    
+    def __call__(self, game):
+        return 0
+
+class RandomBot:
+    """Wanders left and right and fires at random."""
+    
+    def __init__(self, seed, fire_chance=0.1):
+        self.rng = random.Random(seed)
+        self.fire_chance = fire_chance
+        self.move = 0
+    
+    def __call__(self, game):
+        if game.ticks % 30 == 0:
+            self.move = self.rng.choice([0, INPUT_LEFT, INPUT_RIGHT])
+        return self.move | (INPUT_FIRE if self.rng.random() < self.fire_chance else 0)
+
+class TrackerBot:
+    """Leads the formation's sideways drift, fires when a shot will connect and sidesteps falling obstacles."""
+    
+    def __init__(self, seed, fire_every=8):
+        self.fire_every = fire_every
+        self.cooldown = 0
+    
+    def __call__(self, game):
+        center = game.player_x + 25
+        actions = 0
+        self.cooldown -= 1
+        
+        # Dodge the first obstacle that is about to land on the ship
+        obstacles = game.obstacles
+        n = obstacles.count
+        if n:
+            ox, oy, size = obstacles.x[:n], obstacles.y[:n], obstacles.size[:n]
+            danger = np.flatnonzero((oy > game.player_y - 150) & (oy < game.player_y + 30) &
+                                    (np.abs(ox - center) < size + 35))
+            if danger.size:
+                threat = ox[danger[0]]
+                if threat > center and game.player_x > 0 or game.player_x >= WIDTH - 50:
+                    return INPUT_LEFT
+                return INPUT_RIGHT
+        
+        n = game.aliens.count
+        if n:
+            # Where each alien will be when a bullet fired now (8px per tick) reaches its row
+            drift = game.alien_speed * game.get_settings()['alien_speed_mult'] * game.alien_direction
+            flight = (game.player_y - game.aliens.y[:n]) / 8
+            alien_x = np.clip(game.aliens.x[:n] + 20 + drift * flight, 20, WIDTH - 20)
+            offset = alien_x[np.argmin(np.abs(alien_x - BULLET_CENTER - game.player_x))] - BULLET_CENTER - game.player_x
+            if offset < -game.player_speed:
+                actions |= INPUT_LEFT
+            elif offset > game.player_speed:
+                actions |= INPUT_RIGHT
+            if abs(offset) < 12 and self.cooldown <= 0:
+                actions |= INPUT_FIRE
+                self.cooldown = self.fire_every
+        
+        return actions
+
+POLICIES = {
+    'idle': IdleBot,
+    'random': RandomBot,
+    'tracker': TrackerBot
+}
+
+def simulate(job):
+    """Play one headless game; runs in a pool worker."""
+    seed, difficulty, overrides, policy, max_ticks = job
+    game = Game(headless=True)
+    game.difficulty = Difficulty[difficulty]
+    game.settings_override = dict(overrides)
+    result = game.run_headless(POLICIES[policy](seed), max_ticks=max_ticks, seed=seed)
+    result['difficulty'] = difficulty
+    result['overrides'] = overrides
+    return result
+
+def parse_grid(assignments):
+    """Turn ['alien_speed_mult=0.8,1.0'] into a list of override tuples (the cartesian product)."""
+    axes = []
+    for assignment in assignments:
+        key, _, values = assignment.partition('=')
+        if key not in DIFFICULTY_SETTINGS[Difficulty.EASY]:
+            raise SystemExit(f"unknown setting: {key}")
+        axes.append([(key, float(v) if '.' in v else int(v)) for v in values.split(',')])
+    return [tuple(combo) for combo in itertools.product(*axes)]
+
+def summarize(results):
+    """Aggregate per (difficulty, overrides) into one row of distribution statistics."""
+    groups = {}
+    for result in results:
+        groups.setdefault((result['difficulty'], result['overrides']), []).append(result)
+    
+    rows = []
+    for (difficulty, overrides), games in groups.items():
+        survival = np.array([g['ticks'] for g in games]) / TICK_RATE
+        levels = np.array([g['level'] for g in games])
+        scores = np.array([g['score'] for g in games])
+        accuracy = np.array([g['hits'] / max(g['shots'], 1) * 100 for g in games])
+        
+        rows.append({
+            'difficulty': difficulty,
+            'settings': ' '.join(f"{k}={v}" for k, v in overrides) or '(default)',
+            'games': len(games),
+            'survival_p10': np.percentile(survival, 10),
+            'survival_p50': np.percentile(survival, 50),
+            'survival_p90': np.percentile(survival, 90),
+            'level_mean': levels.mean(),
+            'level_max': int(levels.max()),
+            'score_mean': scores.mean(),
+            'score_p50': np.percentile(scores, 50),
+            'score_p90': np.percentile(scores, 90),
+            'accuracy_mean': accuracy.mean(),
+            'capped_pct': np.mean([not g['game_over'] for g in games]) * 100
+        })
+    
+    rows.sort(key=lambda row: (Difficulty[row['difficulty']].value, row['settings']))
+    return rows
+
+# Summary row key -> (table title, format); also the CSV header
+COLUMNS = [
+    ('difficulty', 'Difficulty', '{}'),
+    ('settings', 'Settings', '{}'),
+    ('games', 'Games', '{}'),
+    ('survival_p10', 'Surv p10', '{:.1f}s'),
+    ('survival_p50', 'Surv p50', '{:.1f}s'),
+    ('survival_p90', 'Surv p90', '{:.1f}s'),
+    ('level_mean', 'Lvl avg', '{:.2f}'),
+    ('level_max', 'Lvl max', '{}'),
+    ('score_mean', 'Score avg', '{:.0f}'),
+    ('score_p50', 'Score p50', '{:.0f}'),
+    ('score_p90', 'Score p90', '{:.0f}'),
+    ('accuracy_mean', 'Acc avg', '{:.1f}%'),
+    ('capped_pct', 'Tick cap', '{:.1f}%')
+]
+
+def print_table(rows):
+    cells = [[title for _, title, _ in COLUMNS]]
+    cells += [[fmt.format(row[key]) for key, _, fmt in COLUMNS] for row in rows]
+    widths = [max(len(line[i]) for line in cells) for i in range(len(COLUMNS))]
+    for line in cells:
+        print('  '.join(cell.ljust(width) for cell, width in zip(line, widths)))
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep difficulty settings with headless bot games")
+    parser.add_argument('--games', type=int, default=500, help="games per setting")
+    parser.add_argument('--difficulty', nargs='+', choices=[d.name for d in Difficulty],
+                        default=[d.name for d in Difficulty])
+    parser.add_argument('--set', action='append', default=[], metavar='KEY=V1,V2',
+                        help="grid axis over a DIFFICULTY_SETTINGS key (repeatable)")
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='tracker')
+    parser.add_argument('--max-ticks', type=int, default=TICK_RATE * 600, help="tick limit per game")
+    parser.add_argument('--seed', type=int, default=0, help="first game seed; every setting reuses the same seeds")
+    parser.add_argument('--processes', type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument('--csv', metavar='FILE', help="also write the summary table as CSV")
+    args = parser.parse_args()
+    
+    grid = parse_grid(args.set)
+    jobs = [(args.seed + i, difficulty, overrides, args.policy, args.max_ticks)
+            for difficulty in args.difficulty
+            for overrides in grid
+            for i in range(args.games)]
+    
+    processes = args.processes or multiprocessing.cpu_count()
+    chunksize = max(1, len(jobs) // (processes * 8))
+    started = time.perf_counter()
+    
+    pool = multiprocessing.Pool(processes)
+    results = []
+    for result in pool.imap_unordered(simulate, jobs, chunksize=chunksize):
+        results.append(result)
+        if len(results) % 1000 == 0:
+            print(f"{len(results)}/{len(jobs)} games", file=sys.stderr)
+    
+    # Let the workers exit on their own: SDL traps SIGTERM, so Pool.terminate() can hang
+    pool.close()
+    pool.join()
+    
+    elapsed = time.perf_counter() - started
+    ticks = sum(result['ticks'] for result in results)
+    print(f"{len(results)} games, {ticks} ticks in {elapsed:.1f}s on {processes} processes "
+          f"({ticks / max(elapsed, 1e-9):.0f} ticks/s)", file=sys.stderr)
+    
+    rows = summarize(results)
+    print_table(rows)
+    
+    if args.csv:
+        with open(args.csv, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=[key for key, _, _ in COLUMNS])  # Header only when no games ran
+            writer.writeheader()
+            writer.writerows(rows)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+"""Reproducible micro-benchmarks for the simulation and rendering hot paths.
+
+Every benchmark runs against a fixed, seeded scene under the SDL dummy
+drivers, from the real EASY/MEDIUM/HARD formations up to 10,000-entity
+stress scenes. Game state is restored before every timed call, so each
+sample measures the same work. Per-call latency percentiles are reported
+and compared against a stored baseline, e.g.:
+    
+    python benchmarks.py --save-baseline          # record this machine's numbers
+    python benchmarks.py                          # compare, exit 1 on regressions
+    python benchmarks.py --scene stress-10k --bench check_collisions draw_aliens
+"""
+import os
+
+# Must be set before pygame initializes: benchmarks never open a real window
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+
+import numpy as np
+import pygame
+
+from space_invaders_game import Game, Difficulty, Formation, OBSTACLE_TYPES, PARTICLE_KINDS, WIDTH, HEIGHT
+
+DEFAULT_BASELINE = 'benchmark_baseline.json'
+
+# Scene name -> (difficulty, (alien rows, cols), bullets, obstacles, particles); None uses the difficulty's formation
+SCENES = {
+    'easy': (Difficulty.EASY, None, 10, 2, 200),
+    'medium': (Difficulty.MEDIUM, None, 20, 4, 500),
+    'hard': (Difficulty.HARD, None, 40, 8, 1000),
+    'stress-1k': (Difficulty.HARD, (20, 20), 400, 200, 5000),
+    'stress-10k': (Difficulty.HARD, (50, 80), 4000, 2000, 20000)
+}
+
+# Benchmark name -> call under test; the whole tick is reported as ticks/s
+BENCHMARKS = {
+    'update_aliens': lambda game: game.update_aliens(),
+    'update_bullets': lambda game: game.update_bullets(),
+    'update_obstacles': lambda game: game.update_obstacles(),
+    'check_collisions': lambda game: game.check_collisions(),
+    'step': lambda game: game.step(0),
+    'snapshot_restore': lambda game: game.restore(game.snapshot()),
+    'draw_graffiti': lambda game: game.draw_graffiti(game.screen, game.frame_clock.now),
+    'draw_aliens': lambda game: game.draw_aliens(game.frame_clock.now),
+    'update_particles': lambda game: game.particles.update(1 / 60),
+    'draw_particles': lambda game: game.draw_particles(),
+    'draw_hud': lambda game: game.draw_hud(game.frame_clock.now)
+}
+
+def build_scene(name, seed=0):
+    """Return a Game populated with the named scene, reproducible for a given seed."""
+    difficulty, aliens, bullets, obstacles, particles = SCENES[name]
+    game = Game(leaderboard_path=None)
+    game.difficulty = difficulty
+    game.reset_game(seed)
+    game.state = "PLAYING"
+    game.start_time = game.frame_clock.now
+    rng = np.random.default_rng(seed)
+    
+    # Stress scenes pack a dense formation into the upper playfield, clear of
+    # the edges so update_aliens never turns it or ends the game
+    if aliens is not None:
+        rows, cols = aliens
+        game.spawn_formation(Formation(rows, cols, left=50, top=40, spacing_x=(WIDTH - 140) / cols,
+                                       spacing_y=(HEIGHT - 290) / rows))
+    
+    for x, y in zip(rng.uniform(0, WIDTH - 4, bullets), rng.uniform(20, HEIGHT - 100, bullets)):
+        game.bullets.add(x, y)
+    
+    # Obstacles stay well above the player so no tick ends in a crash
+    for x, y, kind, speed, size in zip(rng.uniform(50, WIDTH - 50, obstacles), rng.uniform(-30, HEIGHT - 250, obstacles),
+                                       rng.integers(len(OBSTACLE_TYPES), size=obstacles),
+                                       rng.integers(2, 6, obstacles), rng.integers(15, 26, obstacles)):
+        game.obstacles.add(x, y, int(kind), float(speed), float(size))
+    
+    # Particles spread over the screen at every age, long-lived enough that none expire while timed
+    for kind in PARTICLE_KINDS:
+        count = particles // len(PARTICLE_KINDS)
+        game.particles.emit(rng.uniform(0, WIDTH, count), rng.uniform(0, HEIGHT, count), rng.normal(0, 50, count),
+                            rng.normal(0, 50, count), 10.0, kind)
+    game.particles.age[:game.particles.count] = rng.uniform(0, 9, game.particles.count)
+    
+    game.bullets_fired = bullets
+    return game
+
+def snapshot(game):
+    """Game.snapshot() plus the cosmetic particles it leaves out, generator included."""
+    particles = game.particles
+    columns = {column: getattr(particles, column)[:particles.count].copy() for column in particles.COLUMNS}
+    return game.snapshot(), particles.count, columns, particles.rng.bit_generator.state
+
+def restore(game, state):
+    data, count, columns, rng_state = state
+    game.restore(data)
+    particles = game.particles
+    for column, values in columns.items():
+        getattr(particles, column)[:count] = values
+    particles.count = count
+    particles.rng.bit_generator.state = rng_state
+
+def measure(game, call, calls, warmup):
+    """Time `calls` invocations from the same starting state; returns nanoseconds per call."""
+    state = snapshot(game)
+    for _ in range(warmup):
+        restore(game, state)
+        call(game)
+    
+    samples = np.empty(calls, dtype=np.int64)
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for i in range(calls):
+            restore(game, state)
+            started = time.perf_counter_ns()
+            call(game)
+            samples[i] = time.perf_counter_ns() - started
+    finally:
+        if gc_enabled:
+            gc.enable()
+    
+    restore(game, state)
+    return samples
+
+def summarize(samples):
+    p50, p95, p99 = np.percentile(samples, [50, 95, 99])
+    return {
+        'calls': int(samples.size),
+        'mean_us': float(samples.mean()) / 1000,
+        'p50_us': float(p50) / 1000,
+        'p95_us': float(p95) / 1000,
+        'p99_us': float(p99) / 1000,
+        'per_second': 1e9 / max(float(samples.mean()), 1.0)
+    }
+
+def run(scenes, benchmarks, calls, warmup, seed):
+    results = {}
+    for scene in scenes:
+        game = build_scene(scene, seed)
+        for bench in benchmarks:
+            results[f"{scene}/{bench}"] = summarize(measure(game, BENCHMARKS[bench], calls, warmup))
+            print(f"{scene}/{bench} done", file=sys.stderr)
+    return results
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor() or platform.machine(),
+        'video_driver': os.environ['SDL_VIDEODRIVER']
+    }
+
+def compare(results, baseline, tolerance):
+    """Annotate results with the p50 change against the baseline; returns the regressed keys."""
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get(key)
+        if reference is None:
+            continue
+        result['change'] = result['p50_us'] / max(reference['p50_us'], 1e-9) - 1
+        if result['change'] > tolerance:
+            regressions.append(key)
+    return regressions
+
+def print_table(results):
+    columns = [
+        ('benchmark', 'Benchmark', '{}'),
+        ('mean_us', 'Mean', '{:.1f}us'),
+        ('p50_us', 'p50', '{:.1f}us'),
+        ('p95_us', 'p95', '{:.1f}us'),
+        ('p99_us', 'p99', '{:.1f}us'),
+        ('per_second', 'Calls/s', '{:.0f}'),
+        ('change', 'vs base', '{:+.1%}')
+    ]
+    
+    cells = [[title for _, title, _ in columns]]
+    for key, result in results.items():
+        row = {**result, 'benchmark': key}
+        cells.append([fmt.format(row[name]) if name in row else '-' for name, _, fmt in columns])
+    widths = [max(len(line[i]) for line in cells) for i in range(len(columns))]
+    for line in cells:
+        print('  '.join(cell.ljust(width) for cell, width in zip(line, widths)))
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the game's simulation and rendering hot paths")
+    parser.add_argument('--scene', nargs='+', choices=list(SCENES), default=list(SCENES))
+    parser.add_argument('--bench', nargs='+', choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument('--calls', type=int, default=200, help="timed calls per benchmark")
+    parser.add_argument('--warmup', type=int, default=20, help="untimed calls before measuring")
+    parser.add_argument('--seed', type=int, default=0, help="scene layout seed")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="baseline file to compare against")
+    parser.add_argument('--save-baseline', action='store_true', help="write the results to the baseline file")
+    parser.add_argument('--tolerance', type=float, default=0.15,
+                        help="allowed p50 slowdown before a benchmark counts as a regression")
+    parser.add_argument('--json', metavar='FILE', help="also write the results as JSON")
+    args = parser.parse_args()
+    
+    results = run(args.scene, args.bench, args.calls, args.warmup, args.seed)
+    report = {'environment': environment(), 'seed': args.seed, 'results': results}
+    
+    regressions = []
+    if args.save_baseline:
+        # Merge so a filtered run only replaces the benchmarks it measured
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                stored = json.load(f)
+            report['results'] = {**stored['results'], **results}
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline written to {args.baseline}", file=sys.stderr)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            stored = json.load(f)
+        if stored['environment'] != report['environment']:
+            print("warning: baseline was recorded in a different environment", file=sys.stderr)
+        regressions = compare(results, stored['results'], args.tolerance)
+    
+    print_table(results)
+    for scene in args.scene:
+        if f"{scene}/step" in results:
+            print(f"{scene}: {results[f'{scene}/step']['per_second']:.0f} ticks/s")
+    
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+    
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,382 @@
+"""Gym-style reinforcement-learning environments over the game rules.
+
+SpaceInvadersEnv drives a single headless Game. VectorSpaceInvadersEnv
+re-implements the same rules on NumPy arrays so one step() advances N
+independent games at once, with no Game objects, windows or clocks:
+    
+    env = VectorSpaceInvadersEnv(256, Difficulty.HARD, seed=0)
+    obs = env.reset()
+    obs, rewards, dones, info = env.step(actions)  # actions: (256,) indices into ACTIONS
+
+Both share one observation layout: five scalars (player x, score, hits,
+shots, level) followed by x, y and alive columns for every alien slot,
+bullet slot and obstacle slot (obstacles also carry their size). Live
+entities are packed to the front of their group; positions are divided by
+the screen size. Rewards are the score gained during the step.
+"""
+import random
+
+import numpy as np
+
+from space_invaders_game import (Game, Difficulty, DIFFICULTY_SETTINGS, INPUT_LEFT, INPUT_RIGHT, INPUT_FIRE,
+                                 TICK_RATE, WIDTH, HEIGHT, ALIEN_TYPES, OBSTACLE_TYPES, CollisionMasks)
+
+# Discrete action space as INPUT_* bits
+ACTIONS = (0, INPUT_LEFT, INPUT_RIGHT, INPUT_FIRE, INPUT_LEFT | INPUT_FIRE, INPUT_RIGHT | INPUT_FIRE)
+
+MAX_BULLETS = 80  # Enough for a shot every tick: a bullet lives at most 78 ticks
+MAX_OBSTACLES = 16
+PLAYER_Y = HEIGHT - 80
+
+def observation_size(difficulty):
+    settings = DIFFICULTY_SETTINGS[difficulty]
+    aliens = settings['alien_rows'] * settings['alien_cols']
+    return 5 + 3 * aliens + 3 * MAX_BULLETS + 4 * MAX_OBSTACLES
+
+def encode_observations(player_x, score, hits, shots, level, groups):
+    """Build the (N, observation_size) float32 batch.
+    
+    `groups` is a list of (alive, columns) pairs of (N, K) arrays; each
+    group is packed so live entities come first, in slot order.
+    """
+    n = len(player_x)
+    parts = [np.stack([player_x / WIDTH, score, hits, shots, level], axis=1)]
+    
+    for alive, columns in groups:
+        order = np.argsort(~alive, axis=1, kind='stable')
+        packed_alive = np.take_along_axis(alive, order, axis=1)
+        for column in columns:
+            parts.append(np.where(packed_alive, np.take_along_axis(column, order, axis=1), 0.0))
+        parts.append(packed_alive)
+    
+    return np.concatenate(parts, axis=1, dtype=np.float32).reshape(n, -1)
+
+class CoverageTable:
+    """Summed-area tables of collision masks, one per shape, padded into one array.
+    
+    Whether a shape has any pixel inside a box is then four lookups, so the
+    narrow phase runs as array operations over every (shape, box) pair at
+    once. Shapes are CollisionMasks entries: (mask, dx, dy, width, height).
+    """
+    
+    def __init__(self, shapes):
+        self.dx = np.array([shape[1] for shape in shapes])
+        self.dy = np.array([shape[2] for shape in shapes])
+        self.width = np.array([shape[3] for shape in shapes])
+        self.height = np.array([shape[4] for shape in shapes])
+        self.table = np.zeros((len(shapes), self.height.max() + 1, self.width.max() + 1), dtype=np.int32)
+        for k, (mask, _, _, width, height) in enumerate(shapes):
+            bits = np.array([[mask.get_at((x, y)) for x in range(width)] for y in range(height)])
+            self.table[k, 1:height + 1, 1:width + 1] = bits.cumsum(axis=0).cumsum(axis=1)
+    
+    def touches(self, shape, x, y, left, top, right, bottom):
+        """Whether `shape` placed at integer (x, y) has a pixel inside [left, right) x [top, bottom)."""
+        x = x + self.dx[shape]
+        y = y + self.dy[shape]
+        width, height = self.width[shape], self.height[shape]
+        x0, x1 = np.clip(left - x, 0, width), np.clip(right - x, 0, width)
+        y0, y1 = np.clip(top - y, 0, height), np.clip(bottom - y, 0, height)
+        t = self.table
+        return t[shape, y1, x1] - t[shape, y0, x1] - t[shape, y1, x0] + t[shape, y0, x0] > 0
+
+class SpaceInvadersEnv:
+    """Single-game environment stepping a headless Game with the exact game rules."""
+    
+    def __init__(self, difficulty=Difficulty.MEDIUM, seed=None, max_ticks=TICK_RATE * 600):
+        self.difficulty = difficulty
+        self.max_ticks = max_ticks
+        self.seeds = random.Random(seed)
+        self.game = Game(headless=True)
+        self.game.difficulty = difficulty
+        self.num_aliens = DIFFICULTY_SETTINGS[difficulty]['alien_rows'] * DIFFICULTY_SETTINGS[difficulty]['alien_cols']
+        self.observation_size = observation_size(difficulty)
+    
+    def reset(self, seed=None):
+        self.game.reset_game(seed if seed is not None else self.seeds.randrange(2**32))
+        self.game.state = "PLAYING"
+        return self.observe()
+    
+    def step(self, action):
+        game = self.game
+        score = game.score
+        game.step(ACTIONS[action])
+        done = game.state != "PLAYING" or game.ticks >= self.max_ticks
+        info = {'score': game.score, 'level': game.level, 'ticks': game.ticks}
+        return self.observe(), game.score - score, done, info
+    
+    @staticmethod
+    def _padded(store, slots, *columns):
+        n = min(store.count, slots)
+        alive = np.zeros((1, slots), dtype=bool)
+        alive[0, :n] = True
+        padded = []
+        for column, scale in columns:
+            values = np.zeros((1, slots))
+            values[0, :n] = column[:n] / scale
+            padded.append(values)
+        return alive, padded
+    
+    def observe(self):
+        game = self.game
+        aliens, bullets, obstacles = game.aliens, game.bullets, game.obstacles
+        groups = [
+            self._padded(aliens, self.num_aliens, (aliens.x, WIDTH), (aliens.y, HEIGHT)),
+            self._padded(bullets, MAX_BULLETS, (bullets.x, WIDTH), (bullets.y, HEIGHT)),
+            self._padded(obstacles, MAX_OBSTACLES, (obstacles.x, WIDTH), (obstacles.y, HEIGHT),
+                         (obstacles.size, 25))
+        ]
+        return encode_observations(np.array([game.player_x]), np.array([game.score]), np.array([game.hits]),
+                                   np.array([game.bullets_fired]), np.array([game.level]), groups)[0]
+
+class VectorSpaceInvadersEnv:
+    """N independent games stepped together, with all state in (N, slots) NumPy arrays.
+    
+    Mirrors Game.step: fire, move, bullets, aliens, obstacles, collisions,
+    then the next wave. Each game's aliens are a formation with one x per
+    column and one y per row, moved exactly as Formation moves them so every
+    alien lands on the same pixel as in Game. A bullet can only hit the
+    alien in the grid cell under it, so collision cost is linear in live
+    bullets. Hits are decided
+    by the same pixel masks as the game, read from CoverageTables, and when
+    several bullets reach the same target in one tick the oldest scores, as
+    in Game. The one rule difference: a later bullet that lost its obstacle
+    to an older one flies on even if it also touches a second obstacle,
+    which Game would hit instead. Finished games are reset automatically,
+    and `info` holds their final score, level and ticks.
+    """
+    
+    def __init__(self, num_envs, difficulty=Difficulty.MEDIUM, seed=None, max_ticks=TICK_RATE * 600):
+        self.num_envs = num_envs
+        self.difficulty = difficulty
+        self.max_ticks = max_ticks
+        self.rng = np.random.default_rng(seed)
+        self.observation_size = observation_size(difficulty)
+        
+        settings = DIFFICULTY_SETTINGS[difficulty]
+        self.speed_mult = settings['alien_speed_mult']
+        self.obstacle_rate = settings['obstacle_rate']
+        self.alien_points = int(10 * settings['points_mult'])
+        self.obstacle_points = int(5 * settings['points_mult'])
+        self.actions = np.array(ACTIONS, dtype=np.int8)
+        
+        # Formation slots, row by row like Game.create_aliens
+        self.rows, self.cols = settings['alien_rows'], settings['alien_cols']
+        self.slot_row, self.slot_col = np.divmod(np.arange(self.rows * self.cols), self.cols)
+        self.home_x = 100 + np.arange(self.cols) * 80.0
+        self.home_y = 50 + np.arange(self.rows) * 60.0
+        
+        # Collision shapes. Obstacle shapes are the asteroids by size (15-25), then the enemy ship
+        masks = CollisionMasks.shared()
+        self.alien_shapes = CoverageTable(masks.aliens)
+        self.obstacle_masks = [masks.asteroids[size] for size in range(15, 26)] + [masks.enemy]
+        self.obstacle_shapes = CoverageTable(self.obstacle_masks)
+        self.player_mask = masks.player
+        
+        n, a = num_envs, self.rows * self.cols
+        self.player_x = np.zeros(n)
+        self.score = np.zeros(n, dtype=np.int64)
+        self.hits = np.zeros(n, dtype=np.int64)
+        self.shots = np.zeros(n, dtype=np.int64)
+        self.level = np.zeros(n, dtype=np.int64)
+        self.ticks = np.zeros(n, dtype=np.int64)
+        self.alien_speed = np.zeros(n)
+        self.alien_direction = np.zeros(n)
+        self.obstacle_timer = np.zeros(n, dtype=np.int64)
+        
+        self.col_x = np.zeros((n, self.cols))
+        self.row_y = np.zeros((n, self.rows))
+        self.alien_alive = np.zeros((n, a), dtype=bool)
+        self.alien_kind = np.zeros((n, a), dtype=np.int64)  # Index into ALIEN_TYPES
+        
+        self.bullet_x = np.zeros((n, MAX_BULLETS))
+        self.bullet_y = np.zeros((n, MAX_BULLETS))
+        self.bullet_alive = np.zeros((n, MAX_BULLETS), dtype=bool)
+        
+        self.obstacle_x = np.zeros((n, MAX_OBSTACLES))
+        self.obstacle_y = np.zeros((n, MAX_OBSTACLES))
+        self.obstacle_speed = np.zeros((n, MAX_OBSTACLES))
+        self.obstacle_size = np.zeros((n, MAX_OBSTACLES))
+        self.obstacle_shape = np.zeros((n, MAX_OBSTACLES), dtype=np.int64)  # Index into obstacle_masks
+        self.obstacle_born = np.zeros((n, MAX_OBSTACLES), dtype=np.int64)  # Spawn tick, Game's store order
+        self.obstacle_alive = np.zeros((n, MAX_OBSTACLES), dtype=bool)
+    
+    def reset(self):
+        self._reset(np.ones(self.num_envs, dtype=bool))
+        return self.observe()
+    
+    def _reset(self, mask):
+        self.player_x[mask] = WIDTH // 2 - 25
+        self.score[mask] = 0
+        self.hits[mask] = 0
+        self.shots[mask] = 0
+        self.level[mask] = 1
+        self.ticks[mask] = 0
+        self.alien_speed[mask] = 1
+        self.alien_direction[mask] = 1
+        self.obstacle_timer[mask] = 0
+        self.bullet_alive[mask] = False
+        self.obstacle_alive[mask] = False
+        self._spawn_wave(mask)
+    
+    def _spawn_wave(self, mask):
+        self.col_x[mask] = self.home_x
+        self.row_y[mask] = self.home_y
+        self.alien_alive[mask] = True
+        self.alien_kind[mask] = self.rng.integers(len(ALIEN_TYPES), size=(np.count_nonzero(mask), self.rows * self.cols))
+    
+    @staticmethod
+    def _first_free(alive, envs):
+        """Pick the first free slot in each of `envs`, skipping envs whose slots are all taken."""
+        free = ~alive[envs]
+        has_free = free.any(axis=1)
+        return envs[has_free], free[has_free].argmax(axis=1)
+    
+    def step(self, actions):
+        bits = self.actions[np.asarray(actions)]
+        score_before = self.score.copy()
+        
+        # Fire
+        firing = np.flatnonzero(bits & INPUT_FIRE)
+        self.shots[firing] += 1
+        envs, slots = self._first_free(self.bullet_alive, firing)
+        self.bullet_x[envs, slots] = self.player_x[envs] + 22
+        self.bullet_y[envs, slots] = PLAYER_Y
+        self.bullet_alive[envs, slots] = True
+        
+        # Player movement
+        self.player_x -= 6 * (((bits & INPUT_LEFT) != 0) & (self.player_x > 0))
+        self.player_x += 6 * (((bits & INPUT_RIGHT) != 0) & (self.player_x < WIDTH - 50))
+        
+        # Bullets
+        self.bullet_y -= 8
+        self.bullet_alive &= self.bullet_y >= 0
+        
+        # Aliens move as one formation; only its outermost live columns and lowest live row matter.
+        # Every column gets the same addition each tick, as in Formation, so positions stay bit-identical
+        self.col_x += (self.alien_speed * self.speed_mult * self.alien_direction)[:, None]
+        grid = self.alien_alive.reshape(-1, self.rows, self.cols)
+        live_cols = grid.any(axis=1)
+        live_rows = grid.any(axis=2)
+        envs = np.arange(self.num_envs)
+        left = self.col_x[envs, live_cols.argmax(axis=1)]
+        right = self.col_x[envs, self.cols - 1 - live_cols[:, ::-1].argmax(axis=1)]
+        bottom = self.row_y[envs, self.rows - 1 - live_rows[:, ::-1].argmax(axis=1)]
+        populated = live_cols.any(axis=1)
+        bounce = populated & ((left <= 0) | (right >= WIDTH - 40))
+        invaded = populated & (bottom >= HEIGHT - 120)
+        self.alien_direction[bounce] *= -1
+        self.row_y[bounce] += 25
+        
+        # Obstacles
+        self.obstacle_timer += 1
+        spawning = np.flatnonzero(self.obstacle_timer >= self.obstacle_rate)
+        self.obstacle_timer[spawning] = 0
+        envs, slots = self._first_free(self.obstacle_alive, spawning)
+        self.obstacle_x[envs, slots] = self.rng.integers(50, WIDTH - 50, len(envs), endpoint=True)
+        self.obstacle_y[envs, slots] = -30
+        self.obstacle_speed[envs, slots] = self.rng.integers(2, 5, len(envs), endpoint=True) * self.speed_mult
+        self.obstacle_size[envs, slots] = self.rng.integers(15, 25, len(envs), endpoint=True)
+        enemy = self.rng.integers(len(OBSTACLE_TYPES), size=len(envs)) == OBSTACLE_TYPES.index('enemy')
+        self.obstacle_shape[envs, slots] = np.where(enemy, len(self.obstacle_masks) - 1,
+                                                    self.obstacle_size[envs, slots].astype(np.int64) - 15)
+        self.obstacle_born[envs, slots] = self.ticks[envs]
+        self.obstacle_alive[envs, slots] = True
+        self.obstacle_y += self.obstacle_speed
+        self.obstacle_alive &= self.obstacle_y <= HEIGHT
+        
+        # Bullet-alien collisions. Alien sprites span at most 41x31 (from 10 above
+        # the alien) on an 80x60 grid, so a 4x10 bullet can only touch the alien
+        # in one formation cell; its mask decides whether it does
+        envs, slots = np.nonzero(self.bullet_alive)
+        bx = self.bullet_x[envs, slots].astype(np.int64)
+        by = self.bullet_y[envs, slots].astype(np.int64)
+        col = np.floor((bx - self.col_x[envs, 0] + 5) / 80).astype(np.int64)
+        row = np.floor((by - self.row_y[envs, 0] + 21) / 60).astype(np.int64)
+        inside = (col >= 0) & (col < self.cols) & (row >= 0) & (row < self.rows)
+        col, row = np.where(inside, col, 0), np.where(inside, row, 0)
+        target = row * self.cols + col
+        hit = np.flatnonzero(inside & self.alien_alive[envs, target])
+        ax = self.col_x[envs[hit], col[hit]].astype(np.int64)
+        ay = self.row_y[envs[hit], row[hit]].astype(np.int64)
+        hit = hit[self.alien_shapes.touches(self.alien_kind[envs[hit], target[hit]], ax, ay,
+                                            bx[hit], by[hit], bx[hit] + 4, by[hit] + 10)]
+        hit = self._by_age(hit, by)
+        hit = hit[self._first_claims(envs[hit] * self.alien_alive.shape[1] + target[hit])]
+        self.bullet_alive[envs[hit], slots[hit]] = False
+        self.alien_alive[envs[hit], target[hit]] = False
+        kills = np.bincount(envs[hit], minlength=self.num_envs)
+        self.score += kills * self.alien_points
+        self.hits += kills
+        
+        # Obstacle sprite boxes, for this tick's bullet and player tests
+        shapes, shape = self.obstacle_shapes, self.obstacle_shape
+        ox, oy = self.obstacle_x.astype(np.int64), self.obstacle_y.astype(np.int64)
+        left, top = ox + shapes.dx[shape], oy + shapes.dy[shape]
+        right, bottom = left + shapes.width[shape], top + shapes.height[shape]
+        
+        # Bullet-obstacle collisions for the bullets still flying: boxes, then masks where they touch
+        envs, slots = np.nonzero(self.bullet_alive)
+        bx = self.bullet_x[envs, slots][:, None].astype(np.int64)
+        by = self.bullet_y[envs, slots][:, None].astype(np.int64)
+        overlap = (self.obstacle_alive[envs] & (bx < right[envs]) & (bx + 4 > left[envs]) &
+                   (by < bottom[envs]) & (by + 10 > top[envs]))
+        b, o = np.nonzero(overlap)
+        e, bx, by = envs[b], bx[b, 0], by[b, 0]
+        overlap[b, o] = shapes.touches(shape[e, o], ox[e, o], oy[e, o], bx, by, bx + 4, by + 10)
+        target = np.where(overlap, self.obstacle_born[envs], np.iinfo(np.int64).max).argmin(axis=1)  # Oldest first
+        hit = self._by_age(np.flatnonzero(overlap.any(axis=1)), self.bullet_y[envs, slots])
+        hit = hit[self._first_claims(envs[hit] * MAX_OBSTACLES + target[hit])]
+        self.bullet_alive[envs[hit], slots[hit]] = False
+        self.obstacle_alive[envs[hit], target[hit]] = False
+        kills = np.bincount(envs[hit], minlength=self.num_envs)
+        self.score += kills * self.obstacle_points
+        self.hits += kills
+        
+        # Player-obstacle collisions: boxes for every game, then the masks of
+        # the few obstacles whose boxes touch a ship
+        px = self.player_x.astype(np.int64)[:, None]
+        player_mask, _, _, pw, ph = self.player_mask
+        near = (self.obstacle_alive & (px < right) & (px + pw > left) & (PLAYER_Y < bottom) & (PLAYER_Y + ph > top))
+        crashed = np.zeros(self.num_envs, dtype=bool)
+        for env, slot in zip(*np.nonzero(near)):
+            mask = self.obstacle_masks[shape[env, slot]][0]
+            if player_mask.overlap(mask, (int(left[env, slot] - px[env, 0]), int(top[env, slot]) - PLAYER_Y)):
+                crashed[env] = True
+        
+        # Next wave
+        cleared = ~self.alien_alive.any(axis=1)
+        self.level[cleared] += 1
+        self.alien_speed[cleared] += 0.3
+        self._spawn_wave(cleared)
+        
+        self.ticks += 1
+        dones = invaded | crashed | (self.ticks >= self.max_ticks)
+        rewards = self.score - score_before
+        info = {'score': self.score.copy(), 'level': self.level.copy(), 'ticks': self.ticks.copy()}
+        
+        if dones.any():
+            self._reset(dones)
+        return self.observe(), rewards, dones, info
+    
+    @staticmethod
+    def _by_age(hits, bullet_y):
+        """Order candidate hits oldest bullet first, the order Game checks them in.
+        
+        Every bullet climbs 8px a tick from the ship and at most one is fired
+        per tick, so the higher a bullet is the earlier it was fired.
+        """
+        return hits[np.argsort(bullet_y[hits], kind='stable')]
+    
+    @staticmethod
+    def _first_claims(keys):
+        """Indices of the first bullet claiming each (game, target) key; later claims miss."""
+        _, first = np.unique(keys, return_index=True)
+        return first
+    
+    def observe(self):
+        groups = [
+            (self.alien_alive, [self.col_x[:, self.slot_col] / WIDTH, self.row_y[:, self.slot_row] / HEIGHT]),
+            (self.bullet_alive, [self.bullet_x / WIDTH, self.bullet_y / HEIGHT]),
+            (self.obstacle_alive, [self.obstacle_x / WIDTH, self.obstacle_y / HEIGHT, self.obstacle_size / 25])
+        ]
+        return encode_observations(self.player_x, self.score, self.hits, self.shots, self.level, groups)
@@ -1,19 +1,69 @@
+import time
+
+IMPORT_STARTED = time.perf_counter()  # Start of the cold-start timeline reported by StartupTimer
+
 import pygame
+import os
 import sys
 import json
-import time
 import math
+import queue
 import random
+import sqlite3
+import struct
+import threading
+import zlib
+import csv
+from collections import OrderedDict
 from datetime import datetime
 from enum import Enum
 
-# Initialize pygame
-pygame.init()
-pygame.mixer.init()
+import numpy as np
 
 # Constants
 WIDTH, HEIGHT = 1000, 700
-FPS = 60
+FPS = 60  # Default render rate cap
+TICK_RATE = 60  # Simulation ticks per second, independent of the render rate
+MAX_CATCH_UP_TICKS = 5  # Ticks run per frame before a slow frame's backlog is dropped
+BACKGROUND_FPS = 10  # How often the backdrop animation (twinkle, graffiti pulse) advances
+IDLE_FPS = 15  # Frame cap in the menus, where only the backdrop and the title bob move
+IDLE_FREEZE_SECONDS = 30  # Menu time without input after which the backdrop stops animating
+
+# Menu screens: nothing simulates, so they are drawn from cached scenes and the loop sleeps on input
+IDLE_STATES = ("MENU", "SETTINGS", "LEADERBOARD")
+
+# Saved games; the JSON files are the pre-database format, imported once
+LEADERBOARD_DB = 'leaderboard.db'
+LEGACY_LEADERBOARD = 'leaderboard.json'
+LEGACY_HIGH_SCORE = 'high_score.json'
+
+# Frame phases timed by FrameProfiler, in the order they run within a frame
+PROFILE_PHASES = ('events', 'update.input', 'update.bullets', 'update.aliens', 'update.obstacles',
+                  'update.collisions', 'update.particles', 'draw.background', 'draw.player', 'draw.aliens',
+                  'draw.obstacles', 'draw.bullets', 'draw.particles', 'draw.hud', 'draw.screen', 'profiler',
+                  'flip', 'idle')
+
+# Practice mode keeps this much per-tick history to rewind through
+REWIND_SECONDS = 10
+
+# Gameplay events streamed by TelemetryLog
+TELEMETRY_EVENTS = ('shot', 'kill', 'destroy', 'level', 'crash', 'invasion')
+TELEMETRY_BATCH = 1024  # Events buffered per game before they go to the writer thread
+TELEMETRY_ROTATE_BYTES = 64 * 2**20  # Start a new telemetry file past this size
+
+# Input bits for one simulation tick (scripted or read from the keyboard)
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_FIRE = 4
+INPUT_PAUSE = 8
+
+# Game.snapshot() layout: a fixed header, the gameplay RNG, then the formation and entity stores
+SNAPSHOT_VERSION = 1
+SNAPSHOT_STATES = ("MENU", "PLAYING", "PAUSED", "GAME_OVER", "SETTINGS", "LEADERBOARD")
+# version, difficulty, state, paused, score, level, ticks, hits, shots, obstacle timer, seed,
+# alien speed, alien direction, player x, previous player x
+SNAPSHOT_HEADER = struct.Struct('<BBB?IIIIIIIdbii')
+RNG_STATE = struct.Struct('<625I')  # The Mersenne Twister's 624 words and its position
 
 # Color Themes
 class Theme(Enum):
@@ -98,393 +148,1515 @@ DIFFICULTY_SETTINGS = {
     }
 }
 
-class Game:
+# Entity kinds, stored as indices into these tuples
+ALIEN_TYPES = ('ufo', 'ship', 'fighter')
+OBSTACLE_TYPES = ('asteroid', 'enemy')
+PARTICLE_KINDS = ('fire', 'trail', 'debris', 'hull')
+
+# Explosion colour from ignition to burnout
+FIRE_RAMP = ((255, 245, 180), (255, 170, 50), (200, 60, 20))
+
+class EntityStore:
+    """Fixed-capacity, structure-of-arrays pool for one group of entities.
+    
+    Live entities are packed into the first `count` slots of every column and
+    the slots past `count` form the free list, so spawning only writes into
+    preallocated arrays. Removal just clears an entity's `alive` flag; the
+    dead are squeezed out by one `compact` at the end of the tick, keeping
+    updates vectorized and entity order (which collisions depend on) stable.
+    Columns only grow if a group outlives the capacity it was sized for.
+    """
+    COLUMNS = ('x', 'y', 'prev_x', 'prev_y', 'speed', 'size', 'kind', 'slot', 'alive')
+    
+    def __init__(self, capacity=64):
+        self.count = 0
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.prev_x = np.zeros(capacity)  # Position at the start of the current tick
+        self.prev_y = np.zeros(capacity)
+        self.speed = np.zeros(capacity)
+        self.size = np.zeros(capacity)
+        self.kind = np.zeros(capacity, dtype=np.int8)
+        self.slot = np.zeros(capacity, dtype=np.int32)  # Formation cell, for aliens
+        self.alive = np.zeros(capacity, dtype=bool)
+    
+    # Between ticks every entity is alive and prev_* only matters for drawing,
+    # so snapshots keep just these
+    SAVED_COLUMNS = ('x', 'y', 'speed', 'size', 'kind', 'slot')
+    COUNT = struct.Struct('<I')
+    
+    def __len__(self):
+        return int(np.count_nonzero(self.alive[:self.count]))
+    
+    def _grow(self):
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            grown = np.zeros(len(column) * 2, dtype=column.dtype)
+            grown[:self.count] = column[:self.count]
+            setattr(self, name, grown)
+    
+    def add(self, x, y, kind=0, speed=0.0, size=0.0, slot=0):
+        if self.count == len(self.x):
+            self._grow()  # Capacity was sized for normal play; only overrides get here
+        i = self.count
+        self.x[i] = self.prev_x[i] = x
+        self.y[i] = self.prev_y[i] = y
+        self.kind[i] = kind
+        self.speed[i] = speed
+        self.size[i] = size
+        self.slot[i] = slot
+        self.alive[i] = True
+        self.count += 1
+        return i
+    
+    def clear(self):
+        self.count = 0
+    
+    def save_positions(self):
+        n = self.count
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+    
+    def interpolated(self, alpha):
+        """Positions blended `alpha` of the way from the last tick to the current one."""
+        n = self.count
+        if alpha >= 1.0:
+            return self.x[:n], self.y[:n]
+        return (self.prev_x[:n] + (self.x[:n] - self.prev_x[:n]) * alpha,
+                self.prev_y[:n] + (self.y[:n] - self.prev_y[:n]) * alpha)
+    
+    def dump(self):
+        """The live entities as bytes: their count, then each saved column's live values."""
+        n = self.count
+        return b''.join([self.COUNT.pack(n)] + [getattr(self, name)[:n].tobytes() for name in self.SAVED_COLUMNS])
+    
+    def load(self, data, offset=0):
+        """Replace the contents with a dump() found at `offset` in `data`; returns the offset after it."""
+        (n,) = self.COUNT.unpack_from(data, offset)
+        offset += self.COUNT.size
+        while len(self.x) < n:
+            self._grow()
+        for name in self.SAVED_COLUMNS:
+            column = getattr(self, name)
+            column[:n] = np.frombuffer(data, column.dtype, n, offset)
+            offset += n * column.itemsize
+        self.prev_x[:n] = self.x[:n]
+        self.prev_y[:n] = self.y[:n]
+        self.alive[:n] = True
+        self.count = n
+        return offset
+    
+    def compact(self):
+        n = self.count
+        keep = self.alive[:n]
+        kept = int(np.count_nonzero(keep))
+        if kept == n:
+            return
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            column[:kept] = column[:n][keep]
+        self.count = kept
+
+class SpatialHash:
+    """Uniform-grid broad phase mapping grid cells to the boxes overlapping them."""
+    
+    def __init__(self, cell_size=64):
+        self.cell_size = cell_size
+        self.cells = {}
+    
+    def rebuild(self, left, top, right, bottom):
+        """Index box i spanning (left[i], top[i])-(right[i], bottom[i])."""
+        self.cells.clear()
+        cs = self.cell_size
+        spans = zip((left // cs).astype(int).tolist(), (top // cs).astype(int).tolist(),
+                    (right // cs).astype(int).tolist(), (bottom // cs).astype(int).tolist())
+        for i, (cx0, cy0, cx1, cy1) in enumerate(spans):
+            for cx in range(cx0, cx1 + 1):
+                for cy in range(cy0, cy1 + 1):
+                    self.cells.setdefault((cx, cy), []).append(i)
+    
+    def query(self, left, top, right, bottom):
+        """Return the indices of boxes sharing a cell with the given box, in index order."""
+        cs = self.cell_size
+        cx0, cy0, cx1, cy1 = int(left // cs), int(top // cs), int(right // cs), int(bottom // cs)
+        if cx0 == cx1 and cy0 == cy1:
+            return self.cells.get((cx0, cy0), ())
+        
+        found = set()
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                found.update(self.cells.get((cx, cy), ()))
+        return sorted(found)
+
+class Formation:
+    """The alien wave as one x per column and one y per row.
+    
+    Every alien in a column shares its x and every alien in a row its y.
+    Live counts per column and row are kept as aliens die, along with the
+    leftmost, rightmost and bottom live lines, so the edge and invasion
+    checks read one column or row instead of scanning the wave. An alien's
+    slot is row * cols + col.
+    """
+    HEADER = struct.Struct('<HHhhh')  # rows, cols, left, right, bottom
+    
+    def __init__(self, rows, cols, left=100, top=50, spacing_x=80, spacing_y=60):
+        self.rows = rows
+        self.cols = cols
+        self.col_x = left + np.arange(cols) * float(spacing_x)
+        self.row_y = top + np.arange(rows) * float(spacing_y)
+        self.col_live = np.full(cols, rows, dtype=np.int64)
+        self.row_live = np.full(rows, cols, dtype=np.int64)
+        self.left = 0
+        self.right = cols - 1
+        self.bottom = rows - 1
+    
+    def __bool__(self):
+        return self.left <= self.right
+    
+    def kill(self, slot):
+        row, col = divmod(slot, self.cols)
+        self.col_live[col] -= 1
+        self.row_live[row] -= 1
+        
+        # Emptied edge lines move inwards; each line is passed at most once per wave
+        while self.left <= self.right and self.col_live[self.left] == 0:
+            self.left += 1
+        while self.right >= self.left and self.col_live[self.right] == 0:
+            self.right -= 1
+        while self.bottom >= 0 and self.row_live[self.bottom] == 0:
+            self.bottom -= 1
+    
+    def to_bytes(self):
+        return b''.join((self.HEADER.pack(self.rows, self.cols, self.left, self.right, self.bottom),
+                         self.col_x.tobytes(), self.row_y.tobytes(), self.col_live.tobytes(), self.row_live.tobytes()))
+    
+    @classmethod
+    def from_bytes(cls, data, offset=0):
+        """Rebuild a formation from to_bytes() output at `offset`; returns it and the offset after it."""
+        formation = cls.__new__(cls)
+        rows, cols, formation.left, formation.right, formation.bottom = cls.HEADER.unpack_from(data, offset)
+        offset += cls.HEADER.size
+        formation.rows, formation.cols = rows, cols
+        arrays = []
+        for dtype, n in ((np.float64, cols), (np.float64, rows), (np.int64, cols), (np.int64, rows)):
+            arrays.append(np.frombuffer(data, dtype, n, offset).copy())
+            offset += n * 8
+        formation.col_x, formation.row_y, formation.col_live, formation.row_live = arrays
+        return formation, offset
+
+class ParticleSystem:
+    """Cosmetic particles (explosions, exhaust) as flat columns of NumPy arrays.
+    
+    Like EntityStore, live particles are packed into the first `count` slots,
+    so integration, ageing and culling are whole-array operations and no
+    particle is ever a Python object. Capacity is fixed: particles spawned
+    into a full system are dropped. Particles only ever use their own
+    generator, so they never disturb the gameplay stream.
+    """
+    COLUMNS = ('x', 'y', 'vx', 'vy', 'age', 'ttl', 'kind')
+    AGE_STEPS = 8  # Sprites per kind, from freshly spawned to about to expire
+    SPRITE_RADIUS = 3
+    DRAG = 0.2  # Fraction of its velocity a particle keeps after one second
+    GRAVITY = 60.0
+    
+    def __init__(self, capacity=32768, seed=None):
+        self.count = 0
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)  # Pixels per second
+        self.vy = np.zeros(capacity)
+        self.age = np.zeros(capacity)  # Seconds
+        self.ttl = np.ones(capacity)
+        self.kind = np.zeros(capacity, dtype=np.intp)
+        self.rng = np.random.default_rng(seed)
+    
+    def __len__(self):
+        return self.count
+    
+    def clear(self):
+        self.count = 0
+    
+    def emit(self, x, y, vx, vy, ttl, kind):
+        """Spawn particles of one kind; array arguments give one particle per element, scalars are shared."""
+        values = (x, y, vx, vy, ttl)
+        start = self.count
+        arrays = [value for value in values if np.ndim(value)]
+        n = min(len(arrays[0]) if arrays else 1, len(self.x) - start)
+        end = start + n
+        for name, value in zip(('x', 'y', 'vx', 'vy', 'ttl'), values):
+            getattr(self, name)[start:end] = value[:n] if np.ndim(value) else value
+        self.age[start:end] = 0.0
+        self.kind[start:end] = PARTICLE_KINDS.index(kind)
+        self.count = end
+    
+    def burst(self, x, y, count, kind, speed, ttl):
+        """Spray `count` particles from (x, y) in every direction at up to `speed` px/s.
+        
+        x, y, count and speed may also be equal-length arrays, one entry per
+        burst, so all of a tick's explosions spawn in one call.
+        """
+        x = np.repeat(x, count)
+        total = len(x)
+        angle = self.rng.uniform(0, 2 * np.pi, total)
+        velocity = self.rng.uniform(0.2, 1.0, total) * np.repeat(speed, count)
+        self.emit(x, np.repeat(y, count), np.cos(angle) * velocity, np.sin(angle) * velocity,
+                  self.rng.uniform(0.5, 1.0, total) * ttl, kind)
+    
+    def update(self, dt):
+        """Advance every particle by `dt` seconds and drop the expired and the off-screen."""
+        n = self.count
+        if not n:
+            return
+        vx, vy = self.vx[:n], self.vy[:n]
+        drag = self.DRAG ** dt
+        vx *= drag
+        vy *= drag
+        vy += self.GRAVITY * dt
+        x, y, age = self.x[:n], self.y[:n], self.age[:n]
+        x += vx * dt
+        y += vy * dt
+        age += dt
+        
+        margin = self.SPRITE_RADIUS
+        keep = (age < self.ttl[:n]) & (x > -margin) & (x < WIDTH + margin) & (y > -margin) & (y < HEIGHT + margin)
+        kept = int(np.count_nonzero(keep))
+        if kept == n:
+            return
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            column[:kept] = column[:n][keep]
+        self.count = kept
+    
+    def draw(self, surface, sprites):
+        """Blit every particle in one batch; returns the rect covering them, or None."""
+        n = self.count
+        if not n:
+            return None
+        
+        # One sprite per kind and age step, all the same size and centred on the particle
+        step = np.minimum((self.age[:n] / self.ttl[:n] * self.AGE_STEPS).astype(np.intp), self.AGE_STEPS - 1)
+        index = self.kind[:n] * self.AGE_STEPS + step
+        left = self.x[:n].astype(np.intp) - self.SPRITE_RADIUS
+        top = self.y[:n].astype(np.intp) - self.SPRITE_RADIUS
+        surface.blits(zip(map(sprites.__getitem__, index.tolist()), zip(left.tolist(), top.tolist())),
+                      doreturn=False)
+        
+        size = 2 * self.SPRITE_RADIUS + 1
+        x0, y0 = int(left.min()), int(top.min())
+        return pygame.Rect(x0, y0, int(left.max()) - x0 + size, int(top.max()) - y0 + size)
+
+class SpriteAtlas:
+    """Alien, player and obstacle sprites rasterized once for one theme.
+    
+    Every sprite is stored as (surface, dx, dy), where (dx, dy) is the offset
+    from the entity position to the surface's top-left corner.
+    """
+    
+    def __init__(self, theme):
+        self.theme = theme
+        colors = THEME_COLORS[theme]
+        
+        # Alien sprites; UFOs get one frame per step of the light chase
+        self.ufo_frames = [self._ufo(colors, frame) for frame in range(3)]
+        self.ship = self._ship(colors)
+        self.fighter = self._fighter(colors)
+        
+        # Player sprites keyed by engine glow radius
+        self.player = {glow: self._player(colors, glow) for glow in range(1, 6)}
+        
+        # Obstacle sprites: asteroids keyed by size, one enemy ship
+        self.asteroids = {size: self._asteroid(colors, size) for size in range(15, 26)}
+        self.enemy = self._enemy(colors)
+        
+        # Particle sprites indexed kind * AGE_STEPS + age step; they shrink and fade as they age
+        tints = {'trail': colors['accent'], 'debris': colors['enemy'], 'hull': colors['player']}
+        self.particles = [self._particle(tints.get(kind), step)
+                          for kind in PARTICLE_KINDS for step in range(ParticleSystem.AGE_STEPS)]
+    
+    @staticmethod
+    def _surface(width, height):
+        surface = pygame.Surface((width, height), pygame.SRCALPHA)
+        return surface.convert_alpha() if pygame.display.get_surface() else surface
+    
+    def _ufo(self, colors, frame):
+        s = self._surface(41, 21)
+        pygame.draw.ellipse(s, colors['enemy'], (0, 5, 40, 15))
+        pygame.draw.ellipse(s, colors['accent'], (5, 0, 30, 10))
+        for i in range(3):
+            light_color = colors['bullet'] if (frame + i) % 3 == 0 else colors['accent']
+            pygame.draw.circle(s, light_color, (10 + i * 10, 10), 2)
+        return s, 0, 0
+    
+    def _ship(self, colors):
+        s = self._surface(41, 31)
+        pygame.draw.rect(s, colors['enemy'], (0, 10, 40, 20))
+        pygame.draw.polygon(s, colors['enemy'], [(20, 0), (0, 10), (40, 10)])
+        return s, 0, -10
+    
+    def _fighter(self, colors):
+        s = self._surface(41, 21)
+        pygame.draw.polygon(s, colors['enemy'], [(20, 0), (0, 20), (40, 20)])
+        pygame.draw.rect(s, colors['accent'], (15, 5, 10, 10))
+        return s, 0, 0
+    
+    def _player(self, colors, glow):
+        s = self._surface(51, 31)
+        pygame.draw.polygon(s, colors['player'], [(25, 0), (10, 30), (40, 30)])
+        pygame.draw.circle(s, colors['accent'], (25, 15), 8)
+        pygame.draw.circle(s, colors['bullet'], (25, 25), glow)
+        return s, 0, 0
+    
+    def _asteroid(self, colors, size):
+        s = self._surface(size * 2 + 1, size * 2 + 1)
+        pygame.draw.circle(s, colors['enemy'], (size, size), size)
+        crater = size - math.ceil(size / 3)
+        pygame.draw.circle(s, colors['bg'], (crater, crater), size // 3)
+        return s, -size, -size
+    
+    def _enemy(self, colors):
+        s = self._surface(30, 20)
+        pygame.draw.rect(s, colors['enemy'], (0, 0, 30, 20))
+        pygame.draw.circle(s, colors['bullet'], (15, 10), 5)
+        return s, -15, -10
+    
+    def _particle(self, tint, step):
+        """One age step of a particle; fire (no tint) cools along FIRE_RAMP."""
+        age = step / ParticleSystem.AGE_STEPS
+        if tint is None:
+            position = age * (len(FIRE_RAMP) - 1)
+            i = min(int(position), len(FIRE_RAMP) - 2)
+            f = position - i
+            tint = tuple(int(a + (b - a) * f) for a, b in zip(FIRE_RAMP[i], FIRE_RAMP[i + 1]))
+        
+        radius = ParticleSystem.SPRITE_RADIUS
+        s = self._surface(radius * 2 + 1, radius * 2 + 1)
+        pygame.draw.circle(s, (*tint, int(255 * (1 - age))), (radius, radius), max(1, radius - int(radius * age)))
+        return s
+
+class CollisionMasks:
+    """Pixel masks for the narrow phase of check_collisions, built once per process.
+    
+    They come from the alpha of the atlas sprites, so hits register exactly
+    where something is drawn. Colours play no part, so one set serves every
+    theme, and headless games too. Masks are stored as (mask, dx, dy, width,
+    height), with the same offset from the entity position as the sprite.
+    """
+    _shared = None
+    
     def __init__(self):
-        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
-        pygame.display.set_caption("Space Invaders Deluxe")
-        self.clock = pygame.time.Clock()
-        self.font = pygame.font.Font(None, 28)
-        self.big_font = pygame.font.Font(None, 64)
+        atlas = SpriteAtlas(Theme.CLASSIC)
+        
+        # Indexed like ALIEN_TYPES; the UFO frames only differ in colour
+        self.aliens = tuple(self._mask(sprite) for sprite in (atlas.ufo_frames[0], atlas.ship, atlas.fighter))
+        self.asteroids = {size: self._mask(sprite) for size, sprite in atlas.asteroids.items()}
+        self.enemy = self._mask(atlas.enemy)
+        self.player = self._mask(atlas.player[1])  # The engine glow stays inside the hull at any size
+        self.bullet = pygame.mask.Mask((4, 10), fill=True)
+    
+    @classmethod
+    def shared(cls):
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+    
+    @staticmethod
+    def _mask(sprite):
+        surface, dx, dy = sprite
+        return (pygame.mask.from_surface(surface), dx, dy, *surface.get_size())
+    
+    def obstacle(self, kind, size):
+        return self.asteroids[int(size)] if OBSTACLE_TYPES[kind] == 'asteroid' else self.enemy
+
+class TextCache:
+    """LRU cache of rendered text surfaces keyed by font, text and colour."""
+    
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+    
+    def render(self, font, text, color):
+        key = (font, text, tuple(color))
+        surface = self.entries.get(key)
+        if surface is None:
+            surface = font.render(text, True, color)
+            self.entries[key] = surface
+            if len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        else:
+            self.entries.move_to_end(key)
+        return surface
+
+class Wave:
+    """A periodic animation value f(sin(speed * t)), read from a table built once.
+    
+    The table holds STEPS samples per period, so animating costs one lookup
+    instead of a sin call and an int conversion per use.
+    """
+    STEPS = 256
+    
+    def __init__(self, speed, shape):
+        self.scale = speed * self.STEPS / (2 * math.pi)
+        self.table = [shape(math.sin(2 * math.pi * i / self.STEPS)) for i in range(self.STEPS)]
+    
+    def __call__(self, t):
+        return self.table[int(t * self.scale) % self.STEPS]
+
+# Every periodic animation, as a function of the frame time
+PLAYER_GLOW = Wave(10, lambda s: 3 + int(2 * s))
+TITLE_BOB = Wave(2, lambda s: int(5 * s))
+PAUSE_PULSE = Wave(2, lambda s: int(20 * abs(s)))
+GAME_OVER_SHAKE = Wave(10, lambda s: int(3 * s))
+GRAFFITI_ALPHA = Wave(1, lambda s: 30 + int(20 * s))
+STAR_BRIGHTNESS = Wave(1, lambda s: 100 + int(50 * s))
+STAR_SIZE = Wave(2, lambda s: 1 + int(s > 0.7))
+
+class FrameClock:
+    """Animation time, sampled once per frame so everything drawn in a frame agrees.
+    
+    By default tick() reads the monotonic perf_counter. With `step` set each
+    tick advances by exactly that many seconds instead, so headless and
+    replay runs see the same times on every machine.
+    """
+    
+    def __init__(self, step=None):
+        self.step = step
+        self.now = 0.0 if step is not None else time.perf_counter()
+    
+    def tick(self):
+        self.now = self.now + self.step if self.step is not None else time.perf_counter()
+        return self.now
+
+class BackgroundCompositor:
+    """Theme fill, graffiti and starfield composited into cached layers.
+    
+    Variants: 'plain' (menus), 'stars' (twinkling playfield) and
+    'still_stars' (game over). A layer is re-rendered at most `fps` times per
+    second, or never when it is requested without a time, so a frame usually
+    costs a single blit.
+    """
+    
+    def __init__(self, game, fps=BACKGROUND_FPS):
+        self.game = game
+        self.fps = fps
+        self.layers = {}
+    
+    def invalidate(self):
+        self.layers.clear()
+    
+    def frame(self, now):
+        """Animation frame shown at time `now`, None when the backdrop is still."""
+        return int(now * self.fps) if now is not None and self.fps > 0 else None
+    
+    def layer(self, variant, now=None):
+        frame = self.frame(now)
+        cached = self.layers.get(variant)
+        if cached is not None and cached[0] == frame:
+            return cached[1]
+        
+        surface = cached[1] if cached is not None else pygame.Surface((WIDTH, HEIGHT)).convert()
+        self.render(surface, variant, frame / self.fps if frame is not None else None)
+        self.layers[variant] = (frame, surface)
+        return surface
+    
+    def render(self, surface, variant, now):
+        game = self.game
+        surface.fill(THEME_COLORS[game.theme]['bg'])
+        game.draw_graffiti(surface, now)
+        
+        if variant == 'stars':
+            t = now or 0.0
+            for i in range(50):
+                x = (i * 37) % WIDTH
+                y = (i * 23) % HEIGHT
+                brightness = STAR_BRIGHTNESS(t + i * 0.1)
+                star_color = (brightness, brightness, brightness)
+                size = STAR_SIZE(t + i * 0.5)
+                pygame.draw.circle(surface, star_color, (x, y), size)
+        
+        elif variant == 'still_stars':
+            for i in range(50):
+                x = (i * 37) % WIDTH
+                y = (i * 23) % HEIGHT
+                pygame.draw.circle(surface, (100, 100, 100), (x, y), 1)
+
+class LeaderboardStore:
+    """Every finished game, kept in SQLite and indexed for top-score queries.
+    
+    Each game is one row inserted in its own transaction, so a crash can at
+    worst lose the game being written. Top-K lookups per difficulty and
+    date range walk the score indexes instead of loading the history. The
+    legacy JSON leaderboard and high score are imported on first open.
+    """
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS runs (
+            id INTEGER PRIMARY KEY,
+            score INTEGER NOT NULL,
+            time INTEGER NOT NULL,
+            accuracy REAL NOT NULL,
+            level INTEGER NOT NULL,
+            difficulty TEXT NOT NULL,
+            date TEXT NOT NULL,
+            hits INTEGER,
+            shots INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS runs_by_score ON runs (score DESC);
+        CREATE INDEX IF NOT EXISTS runs_by_difficulty ON runs (difficulty, score DESC);
+        CREATE INDEX IF NOT EXISTS runs_by_date ON runs (date);
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value);
+    """
+    FIELDS = ('score', 'time', 'accuracy', 'level', 'difficulty', 'date', 'hits', 'shots')
+    
+    def __init__(self, path=LEADERBOARD_DB, legacy_leaderboard=LEGACY_LEADERBOARD,
+                 legacy_high_score=LEGACY_HIGH_SCORE):
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        with self.db:
+            self.db.executescript(self.SCHEMA)
+        if self.get_meta('legacy_imported') is None:
+            self.import_legacy(legacy_leaderboard, legacy_high_score)
+    
+    def get_meta(self, key, default=None):
+        row = self.db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row is not None else default
+    
+    @staticmethod
+    def normalize(entry):
+        """Map a legacy JSON entry onto the current schema."""
+        hits, shots = entry.get('hits'), entry.get('shots')
+        accuracy = entry.get('accuracy')
+        if accuracy is None:
+            accuracy = hits / max(shots, 1) * 100 if hits is not None and shots is not None else 0.0
+        return {
+            'score': int(entry.get('score', 0)),
+            'time': int(entry.get('time') or entry.get('duration') or 0),  # Early builds stored 'duration'
+            'accuracy': float(accuracy),
+            'level': int(entry.get('level', 1)),
+            'difficulty': entry.get('difficulty', Difficulty.MEDIUM.name),
+            'date': entry.get('date', ''),
+            'hits': hits,
+            'shots': shots
+        }
+    
+    def import_legacy(self, leaderboard_path, high_score_path):
+        entries = []
+        high_score = 0
+        try:
+            with open(leaderboard_path) as f:
+                entries = [self.normalize(entry) for entry in json.load(f)]
+        except (OSError, ValueError, TypeError, AttributeError):
+            pass
+        try:
+            with open(high_score_path) as f:
+                high_score = int(json.load(f).get('high_score', 0))
+        except (OSError, ValueError, TypeError, AttributeError):
+            pass
+        
+        # One transaction, so an interrupted import is simply retried next launch
+        with self.db:
+            self._insert(entries)
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('legacy_high_score', ?)", (high_score,))
+            self.db.execute("INSERT OR REPLACE INTO meta VALUES ('legacy_imported', 1)")
+    
+    def add(self, *entries):
+        """Insert finished games, all in one transaction."""
+        with self.db:
+            self._insert(entries)
+    
+    def _insert(self, entries):
+        # Runs inside the caller's transaction
+        self.db.executemany(f"INSERT INTO runs ({', '.join(self.FIELDS)}) "
+                            f"VALUES ({', '.join('?' * len(self.FIELDS))})",
+                            [tuple(entry.get(field) for field in self.FIELDS) for entry in entries])
+    
+    def top(self, limit=10, difficulty=None, since=None, until=None):
+        """Best `limit` games, optionally for one difficulty name and a 'YYYY-MM-DD HH:MM' date range."""
+        where, params = [], []
+        if difficulty is not None:
+            where.append("difficulty = ?")
+            params.append(difficulty)
+        if since is not None:
+            where.append("date >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("date < ?")
+            params.append(until)
+        query = f"SELECT {', '.join(self.FIELDS)} FROM runs"
+        if where:
+            query += " WHERE " + " AND ".join(where)
+        rows = self.db.execute(query + " ORDER BY score DESC, id LIMIT ?", params + [limit])
+        return [dict(row) for row in rows]
+    
+    def high_score(self):
+        best = self.db.execute("SELECT MAX(score) FROM runs").fetchone()[0] or 0
+        return max(best, self.get_meta('legacy_high_score', 0))
+    
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM runs").fetchone()[0]
+    
+    def close(self):
+        self.db.close()
+
+def drain(pending):
+    """Block for the next item on a worker queue, then take whatever else piled up meanwhile."""
+    items = [pending.get()]
+    while True:
+        try:
+            items.append(pending.get_nowait())
+        except queue.Empty:
+            return items
+
+class PersistenceWorker:
+    """Background thread that does the game's disk writes off the frame loop.
+    
+    It starts by opening the leaderboard (importing legacy files if needed)
+    and publishing the high score and top 10 in `scores`. Finished games
+    then queue up and are written in one transaction per wake-up, so a
+    burst of restarts costs one commit. Other writes (replay files) are
+    queued as plain callables. close() flushes everything still pending
+    before returning.
+    """
+    
+    def __init__(self, leaderboard_path):
+        self.leaderboard_path = leaderboard_path
+        self.scores = None  # (high score, top 10) once loaded
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self.run, name="persistence", daemon=True)
+        self.thread.start()
+    
+    def add_run(self, entry):
+        self.queue.put(('run', entry))
+    
+    def submit(self, job, *args):
+        self.queue.put(('job', (job, args)))
+    
+    def close(self):
+        self.queue.put(None)
+        self.thread.join()
+    
+    def run(self):
+        # SQLite connections belong to the thread that opened them
+        try:
+            store = LeaderboardStore(self.leaderboard_path)
+            self.scores = (store.high_score(), store.top(10))
+        except Exception as e:
+            store = None  # Read-only or broken install: play on without saving scores
+            print(f"persistence: leaderboard unavailable: {e!r}", file=sys.stderr)
+            self.scores = (0, [])
+        
+        running = True
+        while running:
+            batch = drain(self.queue)
+            runs = [item[1] for item in batch if item is not None and item[0] == 'run']
+            if runs and store is not None:
+                try:
+                    store.add(*runs)
+                except Exception:
+                    # One bad entry must not stop the worker or take the rest of its batch down with it
+                    for entry in runs:
+                        try:
+                            store.add(entry)
+                        except Exception as e:
+                            print(f"persistence: could not save score {entry!r}: {e!r}", file=sys.stderr)
+            
+            for item in batch:
+                if item is None:
+                    running = False
+                elif item[0] == 'job':
+                    job, args = item[1]
+                    try:
+                        job(*args)
+                    except Exception as e:
+                        print(f"persistence: {getattr(job, '__name__', job)} failed: {e!r}", file=sys.stderr)
+        
+        if store is not None:
+            store.close()
+
+class TelemetryLog:
+    """Opt-in stream of gameplay events, written as columnar JSON lines off the frame loop.
+    
+    record() only appends to an in-memory batch. Full batches, and whatever
+    is left when the next game begins, go to a writer thread that appends
+    each as one JSON line of parallel columns (tick, event, x, y, level)
+    tagged with the game, its seed and difficulty. A new file is started
+    once the current one passes `rotate_bytes`. Call close() at exit so the
+    last game's events reach the disk.
+    """
+    
+    def __init__(self, directory, batch_size=TELEMETRY_BATCH, rotate_bytes=TELEMETRY_ROTATE_BYTES):
+        self.directory = directory
+        self.batch_size = batch_size
+        self.rotate_bytes = rotate_bytes
+        self.session = f"{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}"
+        self.games = 0
+        self.game = None  # Tags of the game being recorded
+        self.events = []
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self.run, name="telemetry", daemon=True)
+        self.thread.start()
+    
+    def begin(self, seed, difficulty):
+        self.flush()
+        self.games += 1
+        self.game = {'game': f"{self.session}-{self.games}", 'seed': seed, 'difficulty': difficulty.name}
+    
+    def record(self, tick, event, x, y, level):
+        self.events.append((tick, event, x, y, level))
+        if len(self.events) >= self.batch_size:
+            self.flush()
+    
+    def flush(self):
+        if self.events:
+            self.queue.put((self.game, self.events))
+            self.events = []
+    
+    def close(self):
+        self.flush()
+        self.queue.put(None)
+        self.thread.join()
+    
+    def run(self):
+        file = None
+        part = 0
+        running = True
+        while running:
+            lines = []
+            for item in drain(self.queue):
+                if item is None:
+                    running = False
+                    continue
+                game, events = item
+                try:
+                    tick, event, x, y, level = zip(*events)
+                    lines.append(json.dumps({**game, 'tick': tick, 'event': event, 'x': [round(v, 1) for v in x],
+                                             'y': [round(v, 1) for v in y], 'level': level}, separators=(',', ':')))
+                except Exception as e:
+                    # A batch that cannot be encoded is dropped on its own; the writer keeps going
+                    print(f"telemetry: dropped {len(events)} events: {e!r}", file=sys.stderr)
+            if not lines:
+                continue
+            
+            try:
+                if file is None or file.tell() >= self.rotate_bytes:
+                    if file is not None:
+                        file.close()
+                        file = None  # If the next part cannot be opened, the next batch retries it
+                    os.makedirs(self.directory, exist_ok=True)
+                    part += 1
+                    file = open(os.path.join(self.directory, f"telemetry-{self.session}-{part:03d}.jsonl"), 'w')
+                file.write('\n'.join(lines) + '\n')
+                file.flush()
+            except OSError:
+                pass  # Telemetry is best effort; the game never waits on or fails because of it
+        
+        if file is not None:
+            file.close()
+
+class StartupTimer:
+    """Breakdown of a cold start, from the module import to the first frame on screen."""
+    
+    def __init__(self):
+        self.phases = [('import', IMPORT_FINISHED - IMPORT_STARTED)]
+        self.last = IMPORT_FINISHED
+        self.done = False
+    
+    def mark(self, phase):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+    
+    def report(self):
+        lines = [f"{phase:<14}{seconds * 1000:8.1f}ms" for phase, seconds in self.phases]
+        lines.append(f"{'first frame at':<14}{sum(seconds for _, seconds in self.phases) * 1000:8.1f}ms")
+        return '\n'.join(lines)
+
+class NullProfiler:
+    """Stand-in used while profiling is off; every hook is a no-op."""
+    enabled = False
+    show_overlay = False
+    
+    def begin_frame(self):
+        pass
+    
+    def lap(self, phase):
+        pass
+    
+    def end_frame(self, ticks=0):
+        pass
+    
+    def close(self):
+        pass
+
+class FrameProfiler:
+    """Per-phase frame timings over a rolling window of recent frames.
+    
+    lap(phase) charges the time since the previous lap to `phase`, so each
+    hook costs one perf_counter read. Percentiles cover the last `window`
+    frames; when `path` is given every frame is also streamed to it as CSV,
+    or as JSON lines if the path ends in .jsonl.
+    """
+    OVERLAY_REFRESH = 0.5  # Seconds between overlay text updates
+    
+    def __init__(self, window=600, path=None, show_overlay=True):
+        self.enabled = True
+        self.show_overlay = show_overlay
+        self.index = {phase: i for i, phase in enumerate(PROFILE_PHASES)}
+        self.current = [0.0] * len(PROFILE_PHASES)
+        self.history = np.zeros((window, len(PROFILE_PHASES)))
+        self.totals = np.zeros(window)
+        self.frames = 0
+        self.worst = (0.0, None)  # Longest frame so far and its costliest working phase
+        self.started = self.frame_start = self.last = time.perf_counter()
+        
+        self.overlay_surface = None
+        self.overlay_time = 0.0
+        self.font = None
+        
+        self.file = self.writer = None
+        if path:
+            self.file = open(path, 'w', newline='')
+            if not path.endswith('.jsonl'):
+                self.writer = csv.writer(self.file)
+                self.writer.writerow(['frame', 'time', 'ticks', 'total_ms'] + list(PROFILE_PHASES))
+    
+    def begin_frame(self):
+        self.frame_start = self.last = time.perf_counter()
+        self.current = [0.0] * len(PROFILE_PHASES)
+    
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.current[self.index[phase]] += now - self.last
+        self.last = now
+    
+    def end_frame(self, ticks=0):
+        total = self.last - self.frame_start
+        row = self.frames % len(self.totals)
+        self.history[row] = self.current
+        self.totals[row] = total
+        if total > self.worst[0]:
+            # Blame the costliest phase other than the frame-cap sleep
+            self.worst = (total, PROFILE_PHASES[int(np.argmax(self.current[:-1]))])
+        
+        if self.file is not None:
+            phases_ms = [round(t * 1000, 3) for t in self.current]
+            timestamp = round(self.frame_start - self.started, 4)
+            if self.writer is not None:
+                self.writer.writerow([self.frames, timestamp, ticks, round(total * 1000, 3)] + phases_ms)
+            else:
+                self.file.write(json.dumps({'frame': self.frames, 'time': timestamp, 'ticks': ticks,
+                                            'total_ms': round(total * 1000, 3),
+                                            'phases': dict(zip(PROFILE_PHASES, phases_ms))}) + '\n')
+        self.frames += 1
+    
+    def stats(self):
+        """Frame and per-phase p50/p95/p99/max in milliseconds over the window."""
+        n = min(self.frames, len(self.totals))
+        if n == 0:
+            return None
+        totals = self.totals[:n] * 1000
+        history = self.history[:n] * 1000
+        return {
+            'frames': self.frames,
+            'total': (*np.percentile(totals, [50, 95, 99]), totals.max()),
+            'phases': {phase: (*np.percentile(history[:, i], [50, 95, 99]), history[:, i].max())
+                       for i, phase in enumerate(PROFILE_PHASES)}
+        }
+    
+    def report(self):
+        stats = self.stats()
+        if stats is None:
+            return "No frames profiled"
+        lines = [f"{'Phase':<18}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}  (ms, last {min(stats['frames'], len(self.totals))} frames)"]
+        for phase, values in [('frame', stats['total'])] + list(stats['phases'].items()):
+            lines.append(f"{phase:<18}" + ''.join(f"{v:9.3f}" for v in values))
+        lines.append(f"Worst frame: {self.worst[0] * 1000:.2f}ms, mostly {self.worst[1]} ({stats['frames']} frames)")
+        return '\n'.join(lines)
+    
+    def draw_overlay(self, screen, pos):
+        """Blit the timing table at `pos`, refreshed twice a second; returns its rect."""
+        now = time.perf_counter()
+        if self.overlay_surface is None or now - self.overlay_time >= self.OVERLAY_REFRESH:
+            self.overlay_time = now
+            self.overlay_surface = self.render_overlay()
+        return screen.blit(self.overlay_surface, pos)
+    
+    def render_overlay(self):
+        if self.font is None:
+            self.font = pygame.font.Font(None, 20)
+        stats = self.stats()
+        lines = ["Frame ms   p50   p95   p99   max"]
+        if stats is not None:
+            lines.append("total    " + ''.join(f"{v:6.2f}" for v in stats['total']))
+            # Only phases that cost something, so the table stays short
+            for phase, values in stats['phases'].items():
+                if values[2] >= 0.05:
+                    lines.append(f"{phase[:8]:<9}" + ''.join(f"{v:6.2f}" for v in values))
+            lines.append(f"worst {self.worst[0] * 1000:.1f}ms ({self.worst[1]})")
+        
+        surface = pygame.Surface((250, 8 + 16 * len(lines)), pygame.SRCALPHA)
+        surface.fill((0, 0, 0, 160))
+        for i, line in enumerate(lines):
+            surface.blit(self.font.render(line, True, (255, 255, 255)), (6, 4 + i * 16))
+        return surface
+    
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+class Game:
+    def __init__(self, headless=False, dirty_rects=False, background_fps=BACKGROUND_FPS, render_fps=FPS,
+                 record_dir=None, profiler=None, leaderboard_path=LEADERBOARD_DB, practice=False, telemetry=None):
+        # Headless games never open a window, draw or touch the save files
+        self.headless = headless
+        self.startup = None if headless else StartupTimer()
+        if self.startup is not None:
+            self.startup.mark('launch')
+        
+        # Frame phase timings; F3 toggles the overlay (and starts profiling if it was off)
+        self.profiler = profiler or NullProfiler()
+        
+        # Gameplay event stream (a TelemetryLog), off unless one is passed in. Practice
+        # games are left out like replays and the leaderboard: rewinding replays ticks
+        self.telemetry = telemetry if not practice else None
+        
+        # Dirty-rect mode pushes only the regions that changed while playing
+        self.dirty_rects = dirty_rects
+        self.last_dirty = None
+        
+        # Rendering runs at its own rate; entities are drawn `interpolation`
+        # of the way between the previous and the latest simulation tick
+        self.render_fps = render_fps
+        self.interpolation = 1.0
+        
+        # Time for animations and time played. Headless games have no frames, so
+        # their clock advances one tick per step instead of following real time
+        self.frame_clock = FrameClock(1 / TICK_RATE if headless else None)
+        self.last_input = self.frame_clock.now
+        self.woken_event = None  # Taken off the queue by the idle wait in run(), not yet handled
+        
+        # Cached backdrop layers and the dimming overlay for PAUSED/GAME_OVER
+        self.compositor = BackgroundCompositor(self, background_fps)
+        self.overlay = None
+        
+        # Menu screens: the cached foreground, the key of what is on screen and where the title is
+        self.scene = None
+        self.scene_drawn = None
+        self.title_rect = None
+        if headless:
+            self.screen = None
+            self.clock = None
+            self.font = None
+            self.big_font = None
+        else:
+            # Only the subsystems the game uses; there are no sounds, so the mixer stays off
+            pygame.display.init()
+            self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
+            pygame.display.set_caption("Space Invaders Deluxe")
+            self.clock = pygame.time.Clock()
+            self.startup.mark('display')
+            pygame.font.init()
+            self.font = pygame.font.Font(None, 28)
+            self.big_font = pygame.font.Font(None, 64)
+            self.startup.mark('fonts')
+        self.text_cache = TextCache()
+        
+        # HUD blits, recomposited only when one of the displayed values changes
+        self.hud_key = None
+        self.hud_blits = []
         
         # Game state
         self.state = "MENU"  # MENU, PLAYING, GAME_OVER, PAUSED, SETTINGS, LEADERBOARD
         self.score = 0
-        self.high_score = self.load_high_score()
+        self.high_score = 0  # Raised to the saved best once the persistence worker has loaded it
         self.start_time = 0
         self.bullets_fired = 0
         self.hits = 0
         self.level = 1
         self.paused = False
+        self.ticks = 0
+        
+        # Gameplay randomness comes from a per-game seeded stream so games can
+        # be replayed; purely cosmetic randomness uses its own generator
+        self.seed = None
+        self.rng = random.Random()
+        self.fx_rng = random.Random()
+        
+        # Input recording, one Replay per game when record_dir is set. Practice
+        # games can be rewound, so they are neither recorded nor ranked
+        self.record_dir = record_dir
+        self.recorder = None
+        self.practice = practice
+        self.rewind = RewindBuffer(REWIND_SECONDS * TICK_RATE) if practice else None
+        self.quicksave = None
         
         # Settings
         self.theme = Theme.CLASSIC
         self.difficulty = Difficulty.MEDIUM
+        self.settings_override = None  # Partial DIFFICULTY_SETTINGS entry, used for balance sweeps
         
         # Player
         self.player_x = WIDTH // 2 - 25
         self.player_y = HEIGHT - 80
         self.player_speed = 6
-        self.bullets = []
+        self.prev_player_x = self.player_x
+        self.pending_actions = 0  # Key presses waiting for the next tick
+        self.bullets = EntityStore(128)  # A bullet lives 78 ticks, so even a shot every tick fits
         
         # Aliens
-        self.aliens = []
+        self.aliens = EntityStore(128)  # The HARD formation is 70
+        self.formation = None
         self.alien_speed = 1
         self.alien_direction = 1
         
         # Obstacles
-        self.obstacles = []
+        self.obstacles = EntityStore(32)
         self.obstacle_timer = 0
         
+        # Collision broad phase, rebuilt every tick
+        self.alien_grid = SpatialHash()
+        self.obstacle_grid = SpatialHash()
+        
+        # Explosions and exhaust; purely cosmetic, so headless games skip them
+        self.particles = None if headless else ParticleSystem()
+        
         # Menu
         self.menu_selection = 0
         self.menu_options = ["Start Game", "Settings", "Leaderboard", "Quit"]
         self.settings_selection = 0
         self.settings_options = ["Theme", "Difficulty", "Back"]
         
-        # Graffiti elements
+        # Graffiti elements, pre-rendered on first draw
         self.graffiti = self.generate_graffiti()
+        self.graffiti_cache = None
         
-        # Leaderboard
-        self.leaderboard = self.load_leaderboard()
+        # Entity sprites, rebuilt lazily for the current theme
+        self.atlas = None
         
-        # Initialize game
-        self.create_aliens()
-    
-    def load_high_score(self):
-        try:
-            with open('high_score.json', 'r') as f:
-                return json.load(f).get('high_score', 0)
-        except:
-            return 0
-    
-    def save_high_score(self):
-        try:
-            with open('high_score.json', 'w') as f:
-                json.dump({'high_score': self.high_score}, f)
-        except:
-            pass
-    
-    def load_leaderboard(self):
-        try:
-            with open('leaderboard.json', 'r') as f:
-                return json.load(f)
-        except:
-            return []
+        # Leaderboard, the top games across all difficulties. The database is
+        # opened and read on the persistence thread, so startup never waits on it
+        self.leaderboard = []
+        self.persistence = None if headless or leaderboard_path is None else PersistenceWorker(leaderboard_path)
+        self.scores_loaded = self.persistence is None
+        
+        # The alien wave is built when a game starts
+        if self.startup is not None:
+            self.startup.mark('game state')
     
-    def save_leaderboard(self):
-        try:
-            with open('leaderboard.json', 'w') as f:
-                json.dump(self.leaderboard, f)
-        except:
-            pass
+    def sync_scores(self):
+        """Take in the saved high score and top 10 once the persistence worker has read them."""
+        if self.scores_loaded or self.persistence.scores is None:
+            return
+        high_score, top = self.persistence.scores
+        self.high_score = max(self.high_score, high_score)
+        
+        # Games finished before the load are already listed (and queued for saving)
+        self.leaderboard = sorted(top + self.leaderboard, key=lambda e: e['score'], reverse=True)[:10]
+        self.scores_loaded = True
     
     def generate_graffiti(self):
         elements = []
         colors = list(THEME_COLORS[self.theme].values())
         
         for _ in range(20):
-            x = random.randint(0, WIDTH)
-            y = random.randint(0, HEIGHT)
-            size = random.randint(10, 30)
-            color = random.choice(colors)
-            shape = random.choice(['circle', 'star', 'triangle', 'rect'])
+            x = self.fx_rng.randint(0, WIDTH)
+            y = self.fx_rng.randint(0, HEIGHT)
+            size = self.fx_rng.randint(10, 30)
+            color = self.fx_rng.choice(colors)
+            shape = self.fx_rng.choice(['circle', 'star', 'triangle', 'rect'])
             elements.append({'x': x, 'y': y, 'size': size, 'color': color, 'shape': shape})
         
         return elements
     
-    def create_aliens(self):
-        self.aliens = []
-        settings = DIFFICULTY_SETTINGS[self.difficulty]
-        
-        for row in range(settings['alien_rows']):
-            for col in range(settings['alien_cols']):
-                x = 100 + col * 80
-                y = 50 + row * 60
-                alien_type = random.choice(['ufo', 'ship', 'fighter'])
-                self.aliens.append({'x': x, 'y': y, 'type': alien_type})
-    
-    def draw_player(self):
-        colors = THEME_COLORS[self.theme]
-        
-        # Draw spaceship
-        points = [
-            (self.player_x + 25, self.player_y),
-            (self.player_x + 10, self.player_y + 30),
-            (self.player_x + 40, self.player_y + 30)
-        ]
-        pygame.draw.polygon(self.screen, colors['player'], points)
-        
-        # Cockpit
-        pygame.draw.circle(self.screen, colors['accent'], (self.player_x + 25, self.player_y + 15), 8)
-        
-        # Engine glow
-        glow_size = 3 + int(2 * math.sin(time.time() * 10))
-        pygame.draw.circle(self.screen, colors['bullet'], (self.player_x + 25, self.player_y + 25), glow_size)
-    
-    def draw_aliens(self):
-        colors = THEME_COLORS[self.theme]
-        
-        for alien in self.aliens:
-            if alien['type'] == 'ufo':
-                # UFO shape
-                pygame.draw.ellipse(self.screen, colors['enemy'], (alien['x'], alien['y'] + 5, 40, 15))
-                pygame.draw.ellipse(self.screen, colors['accent'], (alien['x'] + 5, alien['y'], 30, 10))
-                
-                # Lights (animated)
-                for i in range(3):
-                    light_on = (int(time.time() * 5) + i) % 3 == 0
-                    light_color = colors['bullet'] if light_on else colors['accent']
-                    pygame.draw.circle(self.screen, light_color, (alien['x'] + 10 + i * 10, alien['y'] + 10), 2)
-            
-            elif alien['type'] == 'ship':
-                # Ship shape
-                pygame.draw.rect(self.screen, colors['enemy'], (alien['x'], alien['y'], 40, 20))
-                pygame.draw.polygon(self.screen, colors['enemy'], [
-                    (alien['x'] + 20, alien['y'] - 10),
-                    (alien['x'], alien['y']),
-                    (alien['x'] + 40, alien['y'])
-                ])
-            
-            else:  # fighter
-                # Fighter shape
-                pygame.draw.polygon(self.screen, colors['enemy'], [
-                    (alien['x'] + 20, alien['y']),
-                    (alien['x'], alien['y'] + 20),
-                    (alien['x'] + 40, alien['y'] + 20)
-                ])
-                pygame.draw.rect(self.screen, colors['accent'], (alien['x'] + 15, alien['y'] + 5, 10, 10))
+    def set_theme(self, theme):
+        self.theme = theme
+        self.graffiti = self.generate_graffiti()  # Update graffiti with new theme
+        self.graffiti_cache = None
+        self.compositor.invalidate()
+        self.scene = None
     
-    def draw_obstacles(self):
-        colors = THEME_COLORS[self.theme]
+    def build_graffiti_cache(self):
+        """Rasterize every graffiti element once at full opacity.
         
-        for obstacle in self.obstacles:
-            if obstacle['type'] == 'asteroid':
-                # Asteroid with crater
-                pygame.draw.circle(self.screen, obstacle['color'], (int(obstacle['x']), int(obstacle['y'])), obstacle['size'])
-                pygame.draw.circle(self.screen, colors['bg'], (int(obstacle['x'] - obstacle['size']/3), 
-                                                            int(obstacle['y'] - obstacle['size']/3)), obstacle['size']//3)
-            else:  # enemy ship
-                # Small enemy ship
-                pygame.draw.rect(self.screen, obstacle['color'], (obstacle['x'] - 15, obstacle['y'] - 10, 30, 20))
-                pygame.draw.circle(self.screen, colors['bullet'], (int(obstacle['x']), int(obstacle['y'])), 5)
-    
-    def draw_bullets(self):
-        colors = THEME_COLORS[self.theme]
+        Returns (surface, position, phase) tuples; the pulsing alpha is then
+        applied per frame as surface alpha instead of redrawing the shape.
+        """
+        cache = []
         
-        for bullet in self.bullets:
-            # Bullet with trail
-            pygame.draw.rect(self.screen, colors['bullet'], (bullet[0], bullet[1], 4, 10))
-            
-            # Animated trail
-            trail_length = random.randint(5, 15)
-            pygame.draw.rect(self.screen, colors['accent'], (bullet[0], bullet[1] + 10, 4, trail_length))
-    
-    def draw_graffiti(self):
         for element in self.graffiti:
-            alpha = 30 + int(20 * math.sin(time.time() + element['x'] * 0.01))
+            size = element['size']
+            color = element['color']
+            
+            if element['shape'] == 'rect':
+                s = pygame.Surface((size*2, size), pygame.SRCALPHA)
+                pygame.draw.rect(s, color, (0, 0, size*2, size))
+                cache.append((s, (element['x']-size, element['y']-size//2), element['x'] * 0.01))
+                continue
             
+            s = pygame.Surface((size*2, size*2), pygame.SRCALPHA)
             if element['shape'] == 'circle':
-                s = pygame.Surface((element['size']*2, element['size']*2), pygame.SRCALPHA)
-                pygame.draw.circle(s, (*element['color'], alpha), (element['size'], element['size']), element['size'])
-                self.screen.blit(s, (element['x']-element['size'], element['y']-element['size']))
+                pygame.draw.circle(s, color, (size, size), size)
             
             elif element['shape'] == 'star':
                 points = []
                 for i in range(5):
                     angle = i * 2 * math.pi / 5 - math.pi/2
-                    x = element['size'] + element['size'] * math.cos(angle)
-                    y = element['size'] + element['size'] * math.sin(angle)
-                    points.append((x, y))
-                
-                s = pygame.Surface((element['size']*2, element['size']*2), pygame.SRCALPHA)
-                if len(points) >= 3:
-                    pygame.draw.polygon(s, (*element['color'], alpha), points)
-                self.screen.blit(s, (element['x']-element['size'], element['y']-element['size']))
+                    points.append((size + size * math.cos(angle), size + size * math.sin(angle)))
+                pygame.draw.polygon(s, color, points)
             
             elif element['shape'] == 'triangle':
-                s = pygame.Surface((element['size']*2, element['size']*2), pygame.SRCALPHA)
-                points = [
-                    (element['size'], 0),
-                    (0, element['size']*2),
-                    (element['size']*2, element['size']*2)
-                ]
-                pygame.draw.polygon(s, (*element['color'], alpha), points)
-                self.screen.blit(s, (element['x']-element['size'], element['y']-element['size']))
-            
-            elif element['shape'] == 'rect':
-                s = pygame.Surface((element['size']*2, element['size']), pygame.SRCALPHA)
-                pygame.draw.rect(s, (*element['color'], alpha), (0, 0, element['size']*2, element['size']))
-                self.screen.blit(s, (element['x']-element['size'], element['y']-element['size']//2))
+                pygame.draw.polygon(s, color, [(size, 0), (0, size*2), (size*2, size*2)])
+            
+            cache.append((s, (element['x']-size, element['y']-size), element['x'] * 0.01))
+        
+        return cache
+    
+    def get_settings(self):
+        settings = DIFFICULTY_SETTINGS[self.difficulty]
+        if self.settings_override:
+            settings = {**settings, **self.settings_override}
+        return settings
+    
+    def create_aliens(self):
+        settings = self.get_settings()
+        self.spawn_formation(Formation(settings['alien_rows'], settings['alien_cols']))
+    
+    def spawn_formation(self, formation):
+        self.aliens.clear()
+        self.formation = formation
+        
+        for row in range(formation.rows):
+            for col in range(formation.cols):
+                alien_type = self.rng.choice(ALIEN_TYPES)
+                self.aliens.add(formation.col_x[col], formation.row_y[row], ALIEN_TYPES.index(alien_type),
+                                slot=row * formation.cols + col)
+    
+    def get_atlas(self):
+        if self.atlas is None or self.atlas.theme != self.theme:
+            self.atlas = SpriteAtlas(self.theme)
+        return self.atlas
+    
+    def draw_player(self, now):
+        # Spaceship, cockpit and engine glow come from one pre-rendered frame
+        surface, dx, dy = self.get_atlas().player[PLAYER_GLOW(now)]
+        player_x = self.prev_player_x + (self.player_x - self.prev_player_x) * self.interpolation
+        return [self.screen.blit(surface, (int(player_x) + dx, self.player_y + dy))]
+    
+    def draw_aliens(self, now):
+        atlas = self.get_atlas()
+        n = self.aliens.count
+        
+        # UFO lights (animated) chase one step every 200ms
+        sprites = (atlas.ufo_frames[int(now * 5) % 3], atlas.ship, atlas.fighter)
+        
+        x, y = self.aliens.interpolated(self.interpolation)
+        blits = []
+        for x, y, kind in zip(x.tolist(), y.tolist(), self.aliens.kind[:n].tolist()):
+            surface, dx, dy = sprites[kind]
+            blits.append((surface, (int(x) + dx, int(y) + dy)))
+        return self.screen.blits(blits, doreturn=self.dirty_rects)
+    
+    def draw_obstacles(self):
+        atlas = self.get_atlas()
+        n = self.obstacles.count
+        
+        x, y = self.obstacles.interpolated(self.interpolation)
+        blits = []
+        for x, y, size, kind in zip(x.tolist(), y.tolist(),
+                                    self.obstacles.size[:n].astype(int).tolist(), self.obstacles.kind[:n].tolist()):
+            # Asteroids carry a crater, enemy ships a light
+            surface, dx, dy = atlas.asteroids[size] if OBSTACLE_TYPES[kind] == 'asteroid' else atlas.enemy
+            blits.append((surface, (int(x) + dx, int(y) + dy)))
+        return self.screen.blits(blits, doreturn=self.dirty_rects)
+    
+    def draw_bullets(self):
+        colors = THEME_COLORS[self.theme]
+        rects = []
+        
+        # Their trails are particles, see emit_exhaust
+        x, y = self.bullets.interpolated(self.interpolation)
+        for x, y in zip(x.tolist(), y.tolist()):
+            rects.append(pygame.draw.rect(self.screen, colors['bullet'], (x, y, 4, 10)))
+        
+        return rects
+    
+    def draw_particles(self):
+        rect = self.particles.draw(self.screen, self.get_atlas().particles)
+        return [rect] if rect is not None else []
+    
+    def draw_graffiti(self, target, now=None):
+        """Blit the graffiti onto `target`, pulsed for time `now` (None: mid-pulse)."""
+        if self.graffiti_cache is None:
+            self.graffiti_cache = self.build_graffiti_cache()
+        
+        for surface, pos, phase in self.graffiti_cache:
+            surface.set_alpha(GRAFFITI_ALPHA(now + phase) if now is not None else 30)
+        target.blits([(surface, pos) for surface, pos, _ in self.graffiti_cache], doreturn=False)
     
     def update_bullets(self):
-        for bullet in self.bullets[:]:
-            bullet[1] -= 8
-            if bullet[1] < 0:
-                self.bullets.remove(bullet)
+        bullets = self.bullets
+        y = bullets.y[:bullets.count]
+        y -= 8
+        bullets.alive[:bullets.count] &= y >= 0
     
     def update_aliens(self):
-        if not self.aliens:
+        formation = self.formation
+        if not formation:
             return
         
-        settings = DIFFICULTY_SETTINGS[self.difficulty]
+        settings = self.get_settings()
         current_speed = self.alien_speed * settings['alien_speed_mult']
-        move_down = False
+        col_x, row_y = formation.col_x, formation.row_y
+        n = self.aliens.count
         
-        for alien in self.aliens:
-            alien['x'] += current_speed * self.alien_direction
-            if alien['x'] <= 0 or alien['x'] >= WIDTH - 40:
-                move_down = True
-            
-            # Game over if aliens reach bottom
-            if alien['y'] >= HEIGHT - 120:
-                self.state = "GAME_OVER"
+        # Aliens get the same additions as their column and row, so they stay bit-identical to them
+        step = current_speed * self.alien_direction
+        col_x += step
+        self.aliens.x[:n] += step
+        move_down = col_x[formation.left] <= 0 or col_x[formation.right] >= WIDTH - 40
+        
+        # Game over if aliens reach bottom
+        if row_y[formation.bottom] >= HEIGHT - 120:
+            self.state = "GAME_OVER"
+            if self.telemetry is not None:
+                self.telemetry.record(self.ticks, 'invasion', self.player_x + 25, self.player_y, self.level)
         
         if move_down:
             self.alien_direction *= -1
-            for alien in self.aliens:
-                alien['y'] += 25
+            row_y += 25
+            self.aliens.y[:n] += 25
     
     def update_obstacles(self):
-        settings = DIFFICULTY_SETTINGS[self.difficulty]
+        settings = self.get_settings()
         self.obstacle_timer += 1
         
         # Spawn new obstacles
         if self.obstacle_timer >= settings['obstacle_rate']:
             self.obstacle_timer = 0
             
-            # Create random obstacle
-            obstacle_type = random.choice(['asteroid', 'enemy'])
-            obstacle_color = THEME_COLORS[self.theme]['enemy']
-            
-            self.obstacles.append({
-                'x': random.randint(50, WIDTH-50),
-                'y': -30,
-                'speed': random.randint(2, 5) * settings['alien_speed_mult'],
-                'type': obstacle_type,
-                'color': obstacle_color,
-                'size': random.randint(15, 25)
-            })
+            # Create random obstacle (drawn in the theme's enemy colour)
+            obstacle_type = self.rng.choice(OBSTACLE_TYPES)
+            x = self.rng.randint(50, WIDTH-50)
+            speed = self.rng.randint(2, 5) * settings['alien_speed_mult']
+            size = self.rng.randint(15, 25)
+            self.obstacles.add(x, -30, OBSTACLE_TYPES.index(obstacle_type), speed, size)
         
         # Move obstacles
-        for obstacle in self.obstacles[:]:
-            obstacle['y'] += obstacle['speed']
-            if obstacle['y'] > HEIGHT:
-                self.obstacles.remove(obstacle)
+        obstacles = self.obstacles
+        n = obstacles.count
+        y = obstacles.y[:n]
+        y += obstacles.speed[:n]
+        obstacles.alive[:n] &= y <= HEIGHT
+    
+    def explode(self, x, y, scale, debris):
+        """Fire and `debris` particles bursting from each (x, y); scale 1 is an alien."""
+        particles = self.particles
+        scale = np.asarray(scale)
+        particles.burst(x, y, (40 * scale).astype(np.intp), 'fire', 160 * scale, 0.6)
+        particles.burst(x, y, (12 * scale).astype(np.intp), debris, 240 * scale, 1.0)
+    
+    def emit_exhaust(self):
+        """One puff of exhaust behind every bullet and the player's engine per tick."""
+        particles = self.particles
+        rng = particles.rng
+        n = self.bullets.count
+        particles.emit(self.bullets.x[:n] + 2, self.bullets.y[:n] + 10, rng.normal(0, 15, n),
+                       rng.uniform(40, 100, n), 0.25, 'trail')
+        particles.emit(self.player_x + 25, self.player_y + 28, rng.normal(0, 20, 2), rng.uniform(80, 140, 2),
+                       0.2, 'fire')
     
     def check_collisions(self):
-        settings = DIFFICULTY_SETTINGS[self.difficulty]
-        
-        # Bullet-alien collisions
-        for bullet in self.bullets[:]:
-            for alien in self.aliens[:]:
-                if (bullet[0] < alien['x'] + 40 and bullet[0] + 4 > alien['x'] and
-                    bullet[1] < alien['y'] + 20 and bullet[1] + 10 > alien['y']):
-                    self.bullets.remove(bullet)
-                    self.aliens.remove(alien)
-                    self.score += int(10 * settings['points_mult'])
-                    self.hits += 1
-                    break
+        settings = self.get_settings()
+        telemetry = self.telemetry
+        explosions = []  # (x, y, scale) of every alien and obstacle hit this tick
+        
+        # Entities that left the screen this tick are still in the stores, flagged dead
+        bullets, aliens, obstacles = self.bullets, self.aliens, self.obstacles
+        bullet_x = bullets.x[:bullets.count].tolist()
+        bullet_y = bullets.y[:bullets.count].tolist()
+        bullet_alive = bullets.alive[:bullets.count].tolist()
+        
+        # Sprites sit at integer pixels, so the narrow phase works on those. Each
+        # candidate's bounding box is tested first, and its mask only if they touch
+        masks = CollisionMasks.shared()
+        bullet_mask = masks.bullet
+        
+        # Bullet-alien collisions: each bullet takes out the first alien it overlaps
+        if aliens.count and bullets.count:
+            ax, ay = aliens.x[:aliens.count], aliens.y[:aliens.count]
+            self.alien_grid.rebuild(ax - 1, ay - 11, ax + 42, ay + 22)  # Covers every alien sprite
+            ax, ay = aliens.x[:aliens.count].astype(int).tolist(), aliens.y[:aliens.count].astype(int).tolist()
+            alien_alive = aliens.alive[:aliens.count].tolist()
+            alien_slot = aliens.slot[:aliens.count].tolist()
+            alien_kind = aliens.kind[:aliens.count].tolist()
+            alien_masks = masks.aliens
+            
+            for b, (bx, by) in enumerate(zip(bullet_x, bullet_y)):
+                if not bullet_alive[b]:
+                    continue
+                bx, by = int(bx), int(by)
+                for i in self.alien_grid.query(bx, by, bx + 4, by + 10):
+                    if not alien_alive[i]:
+                        continue
+                    mask, dx, dy, w, h = alien_masks[alien_kind[i]]
+                    x, y = ax[i] + dx, ay[i] + dy
+                    if (bx < x + w and bx + 4 > x and by < y + h and by + 10 > y and
+                            mask.overlap(bullet_mask, (bx - x, by - y)) is not None):
+                        bullet_alive[b] = False
+                        alien_alive[i] = False
+                        self.formation.kill(alien_slot[i])
+                        self.score += int(10 * settings['points_mult'])
+                        self.hits += 1
+                        explosions.append((ax[i] + 20, ay[i] + 10, 1.0))
+                        if telemetry is not None:
+                            telemetry.record(self.ticks, 'kill', ax[i] + 20, ay[i] + 10, self.level)
+                        break
+            
+            aliens.alive[:aliens.count] = alien_alive
         
         # Bullet-obstacle collisions
-        for bullet in self.bullets[:]:
-            for obstacle in self.obstacles[:]:
-                if (bullet[0] < obstacle['x'] + obstacle['size'] and bullet[0] + 4 > obstacle['x'] - obstacle['size'] and
-                    bullet[1] < obstacle['y'] + obstacle['size'] and bullet[1] + 10 > obstacle['y'] - obstacle['size']):
-                    self.bullets.remove(bullet)
-                    self.obstacles.remove(obstacle)
-                    self.score += int(5 * settings['points_mult'])
-                    self.hits += 1
-                    break
-        
-        # Player-obstacle collisions
-        for obstacle in self.obstacles[:]:
-            if (self.player_x < obstacle['x'] + obstacle['size'] and self.player_x + 50 > obstacle['x'] - obstacle['size'] and
-                self.player_y < obstacle['y'] + obstacle['size'] and self.player_y + 30 > obstacle['y'] - obstacle['size']):
+        if obstacles.count and bullets.count:
+            osize = obstacles.size[:obstacles.count]
+            ox, oy = obstacles.x[:obstacles.count], obstacles.y[:obstacles.count]
+            self.obstacle_grid.rebuild(ox - osize - 1, oy - osize - 1, ox + osize + 2, oy + osize + 2)
+            ox, oy, osize = ox.astype(int).tolist(), oy.astype(int).tolist(), osize.tolist()
+            obstacle_alive = obstacles.alive[:obstacles.count].tolist()
+            obstacle_kind = obstacles.kind[:obstacles.count].tolist()
+            
+            for b, (bx, by) in enumerate(zip(bullet_x, bullet_y)):
+                if not bullet_alive[b]:
+                    continue
+                bx, by = int(bx), int(by)
+                for i in self.obstacle_grid.query(bx, by, bx + 4, by + 10):
+                    if not obstacle_alive[i]:
+                        continue
+                    mask, dx, dy, w, h = masks.obstacle(obstacle_kind[i], osize[i])
+                    x, y = ox[i] + dx, oy[i] + dy
+                    if (bx < x + w and bx + 4 > x and by < y + h and by + 10 > y and
+                            mask.overlap(bullet_mask, (bx - x, by - y)) is not None):
+                        bullet_alive[b] = False
+                        obstacle_alive[i] = False
+                        self.score += int(5 * settings['points_mult'])
+                        self.hits += 1
+                        explosions.append((ox[i], oy[i], osize[i] / 20))
+                        if telemetry is not None:
+                            telemetry.record(self.ticks, 'destroy', ox[i], oy[i], self.level)
+                        break
+            
+            obstacles.alive[:obstacles.count] = obstacle_alive
+        
+        if explosions and self.particles is not None:
+            self.explode(*zip(*explosions), 'debris')
+        
+        # Remove everything that was hit or left the screen in one pass
+        bullets.alive[:bullets.count] = bullet_alive
+        bullets.compact()
+        aliens.compact()
+        obstacles.compact()
+        
+        # Player-obstacle collisions: boxes for the whole group at once, then the
+        # masks of the few obstacles whose boxes touch the ship
+        ox, oy = obstacles.x[:obstacles.count], obstacles.y[:obstacles.count]
+        osize = obstacles.size[:obstacles.count]
+        player_mask, _, _, pw, ph = masks.player
+        px, py = int(self.player_x), int(self.player_y)
+        near = np.flatnonzero((px < ox + osize + 2) & (px + pw > ox - osize - 1) &
+                              (py < oy + osize + 2) & (py + ph > oy - osize - 1))
+        for i in near.tolist():
+            mask, dx, dy, _, _ = masks.obstacle(obstacles.kind[i], osize[i])
+            if player_mask.overlap(mask, (int(ox[i]) + dx - px, int(oy[i]) + dy - py)) is not None:
                 self.state = "GAME_OVER"
+                if self.particles is not None:
+                    self.explode(self.player_x + 25, self.player_y + 15, 3.0, 'hull')
+                if telemetry is not None:
+                    telemetry.record(self.ticks, 'crash', self.player_x + 25, self.player_y + 15, self.level)
+                break
+    
+    def render_text(self, text, color, big=False):
+        return self.text_cache.render(self.big_font if big else self.font, text, color)
     
-    def draw_hud(self):
+    def compose_hud(self, time_played):
         colors = THEME_COLORS[self.theme]
+        blits = []
         
         # Score
-        score_text = self.font.render(f"Score: {self.score}", True, colors['text'])
-        self.screen.blit(score_text, (10, 10))
+        blits.append((self.render_text(f"Score: {self.score}", colors['text']), (10, 10)))
         
         # High score
-        high_score_text = self.font.render(f"High: {self.high_score}", True, colors['accent'])
-        self.screen.blit(high_score_text, (10, 40))
+        blits.append((self.render_text(f"High: {self.high_score}", colors['accent']), (10, 40)))
         
         # Level and time
-        time_played = time.time() - self.start_time if self.start_time > 0 else 0
-        level_text = self.font.render(f"Level: {self.level}", True, colors['text'])
-        time_text = self.font.render(f"Time: {int(time_played)}s", True, colors['text'])
-        self.screen.blit(level_text, (10, 70))
-        self.screen.blit(time_text, (10, 100))
+        blits.append((self.render_text(f"Level: {self.level}", colors['text']), (10, 70)))
+        blits.append((self.render_text(f"Time: {time_played}s", colors['text']), (10, 100)))
         
         # Difficulty and theme
-        diff_text = self.font.render(f"Difficulty: {self.difficulty.name}", True, colors['accent'])
-        theme_text = self.font.render(f"Theme: {self.theme.name}", True, colors['accent'])
-        self.screen.blit(diff_text, (WIDTH - 200, 10))
-        self.screen.blit(theme_text, (WIDTH - 200, 40))
+        blits.append((self.render_text(f"Difficulty: {self.difficulty.name}", colors['accent']), (WIDTH - 200, 10)))
+        blits.append((self.render_text(f"Theme: {self.theme.name}", colors['accent']), (WIDTH - 200, 40)))
         
         # Accuracy
         if self.bullets_fired > 0:
             accuracy = (self.hits / self.bullets_fired) * 100
-            acc_text = self.font.render(f"Accuracy: {accuracy:.1f}%", True, colors['text'])
-            self.screen.blit(acc_text, (WIDTH - 200, 70))
+            blits.append((self.render_text(f"Accuracy: {accuracy:.1f}%", colors['text']), (WIDTH - 200, 70)))
         
         # Controls
         controls = ["P-Pause", "R-Restart", "ESC-Menu"]
+        left = WIDTH - 120
+        if self.practice:
+            controls = ["BKSP-Rewind", "F5-Save", "F9-Load"] + controls
+            left = WIDTH - 140
         for i, control in enumerate(controls):
-            control_text = self.font.render(control, True, colors['text'])
-            self.screen.blit(control_text, (WIDTH - 120, HEIGHT - 80 + i * 25))
+            blits.append((self.render_text(control, colors['text']), (left, HEIGHT - 5 - (len(controls) - i) * 25)))
+        
+        return blits
     
-    def draw_menu(self):
+    def draw_hud(self, now):
+        time_played = int(now - self.start_time) if self.start_time > 0 else 0
+        hud_key = (self.score, self.high_score, self.level, time_played, self.hits, self.bullets_fired,
+                   self.difficulty, self.theme)
+        if hud_key != self.hud_key:
+            self.hud_key = hud_key
+            self.hud_blits = self.compose_hud(time_played)
+        return self.screen.blits(self.hud_blits, doreturn=self.dirty_rects)
+    
+    def draw_menu(self, surface):
         colors = THEME_COLORS[self.theme]
-        self.screen.fill(colors['bg'])
-        
-        # Draw graffiti background
-        self.draw_graffiti()
         
-        # Title with animation
-        title_offset = int(5 * math.sin(time.time() * 2))
-        title = self.big_font.render("SPACE INVADERS", True, colors['accent'])
-        title_rect = title.get_rect(center=(WIDTH//2, 120 + title_offset))
-        self.screen.blit(title, title_rect)
-        
-        # Menu options
+        # Menu options; the bobbing title goes on top in draw_menu_title
         for i, option in enumerate(self.menu_options):
             color = colors['accent'] if i == self.menu_selection else colors['text']
-            text = self.font.render(option, True, color)
+            text = self.render_text(option, color)
             text_rect = text.get_rect(center=(WIDTH//2, 250 + i * 50))
             
             # Highlight selected option
             if i == self.menu_selection:
                 highlight_rect = pygame.Rect(text_rect.x - 20, text_rect.y - 5, text_rect.width + 40, text_rect.height + 10)
-                pygame.draw.rect(self.screen, color + (50,), highlight_rect, 2)
+                pygame.draw.rect(surface, color, highlight_rect, 2)
             
-            self.screen.blit(text, text_rect)
+            surface.blit(text, text_rect)
         
         # Instructions
-        inst_text = self.font.render("Arrow Keys + Enter to navigate", True, colors['text'])
+        inst_text = self.render_text("Arrow Keys + Enter to navigate", colors['text'])
         inst_rect = inst_text.get_rect(center=(WIDTH//2, HEIGHT - 80))
-        self.screen.blit(inst_text, inst_rect)
+        surface.blit(inst_text, inst_rect)
         
         # High score
-        hs_text = self.font.render(f"High Score: {self.high_score}", True, colors['accent'])
+        hs_text = self.render_text(f"High Score: {self.high_score}", colors['accent'])
         hs_rect = hs_text.get_rect(center=(WIDTH//2, HEIGHT - 50))
-        self.screen.blit(hs_text, hs_rect)
+        surface.blit(hs_text, hs_rect)
+    
+    def draw_menu_title(self, title_offset):
+        title = self.render_text("SPACE INVADERS", THEME_COLORS[self.theme]['accent'], big=True)
+        title_rect = title.get_rect(center=(WIDTH//2, 120 + title_offset))
+        return self.screen.blit(title, title_rect)
     
-    def draw_settings(self):
+    def draw_settings(self, surface):
         colors = THEME_COLORS[self.theme]
-        self.screen.fill(colors['bg'])
-        
-        # Draw graffiti background
-        self.draw_graffiti()
         
         # Title
-        title = self.big_font.render("SETTINGS", True, colors['accent'])
+        title = self.render_text("SETTINGS", colors['accent'], big=True)
         title_rect = title.get_rect(center=(WIDTH//2, 100))
-        self.screen.blit(title, title_rect)
+        surface.blit(title, title_rect)
         
         # Settings options
         settings_info = [
@@ -495,15 +1667,15 @@ class Game:
         
         for i, info in enumerate(settings_info):
             color = colors['accent'] if i == self.settings_selection else colors['text']
-            text = self.font.render(info, True, color)
+            text = self.render_text(info, color)
             text_rect = text.get_rect(center=(WIDTH//2, 200 + i * 60))
             
             # Highlight selected option
             if i == self.settings_selection:
                 highlight_rect = pygame.Rect(text_rect.x - 20, text_rect.y - 5, text_rect.width + 40, text_rect.height + 10)
-                pygame.draw.rect(self.screen, color + (50,), highlight_rect, 2)
+                pygame.draw.rect(surface, color, highlight_rect, 2)
             
-            self.screen.blit(text, text_rect)
+            surface.blit(text, text_rect)
         
         # Theme preview
         if self.settings_selection == 0:
@@ -519,20 +1691,20 @@ class Game:
                 box_x = start_x + i * (box_size + gap)
                 
                 # Draw theme box
-                pygame.draw.rect(self.screen, theme_colors['bg'], (box_x, preview_y, box_size, box_size))
-                pygame.draw.rect(self.screen, theme_colors['player'], (box_x + 5, preview_y + 5, 10, 10))
-                pygame.draw.rect(self.screen, theme_colors['enemy'], (box_x + 25, preview_y + 5, 10, 10))
-                pygame.draw.rect(self.screen, theme_colors['bullet'], (box_x + 15, preview_y + 20, 10, 10))
+                pygame.draw.rect(surface, theme_colors['bg'], (box_x, preview_y, box_size, box_size))
+                pygame.draw.rect(surface, theme_colors['player'], (box_x + 5, preview_y + 5, 10, 10))
+                pygame.draw.rect(surface, theme_colors['enemy'], (box_x + 25, preview_y + 5, 10, 10))
+                pygame.draw.rect(surface, theme_colors['bullet'], (box_x + 15, preview_y + 20, 10, 10))
                 
                 # Highlight current theme
                 if theme == self.theme:
-                    pygame.draw.rect(self.screen, theme_colors['accent'], (box_x - 2, preview_y - 2, box_size + 4, box_size + 4), 2)
+                    pygame.draw.rect(surface, theme_colors['accent'], (box_x - 2, preview_y - 2, box_size + 4, box_size + 4), 2)
             
             # Theme names
             theme_names = [t.name for t in Theme]
-            names_text = self.font.render(" | ".join(theme_names), True, colors['text'])
+            names_text = self.render_text(" | ".join(theme_names), colors['text'])
             names_rect = names_text.get_rect(center=(WIDTH//2, preview_y + box_size + 20))
-            self.screen.blit(names_text, names_rect)
+            surface.blit(names_text, names_rect)
         
         # Difficulty info
         elif self.settings_selection == 1:
@@ -544,38 +1716,34 @@ class Game:
             
             for i, info in enumerate(diff_info):
                 text_color = colors['accent'] if i == self.difficulty.value else colors['text']
-                diff_text = self.font.render(info, True, text_color)
+                diff_text = self.render_text(info, text_color)
                 diff_rect = diff_text.get_rect(center=(WIDTH//2, 350 + i * 30))
-                self.screen.blit(diff_text, diff_rect)
+                surface.blit(diff_text, diff_rect)
         
         # Instructions
-        inst_text = self.font.render("Enter to change | ESC to go back", True, colors['text'])
+        inst_text = self.render_text("Enter to change | ESC to go back", colors['text'])
         inst_rect = inst_text.get_rect(center=(WIDTH//2, HEIGHT - 50))
-        self.screen.blit(inst_text, inst_rect)
+        surface.blit(inst_text, inst_rect)
     
-    def draw_leaderboard(self):
+    def draw_leaderboard(self, surface):
         colors = THEME_COLORS[self.theme]
-        self.screen.fill(colors['bg'])
-        
-        # Draw graffiti background
-        self.draw_graffiti()
         
         # Title
-        title = self.big_font.render("LEADERBOARD", True, colors['accent'])
+        title = self.render_text("LEADERBOARD", colors['accent'], big=True)
         title_rect = title.get_rect(center=(WIDTH//2, 80))
-        self.screen.blit(title, title_rect)
+        surface.blit(title, title_rect)
         
         if not self.leaderboard:
-            no_scores = self.font.render("No scores yet! Play to set records!", True, colors['text'])
+            no_scores = self.render_text("No scores yet! Play to set records!", colors['text'])
             no_rect = no_scores.get_rect(center=(WIDTH//2, HEIGHT//2))
-            self.screen.blit(no_scores, no_rect)
+            surface.blit(no_scores, no_rect)
         else:
             # Headers
             headers = ["Rank", "Score", "Time", "Level", "Difficulty"]
             header_text = " | ".join(headers)
-            header_surface = self.font.render(header_text, True, colors['accent'])
+            header_surface = self.render_text(header_text, colors['accent'])
             header_rect = header_surface.get_rect(center=(WIDTH//2, 140))
-            self.screen.blit(header_surface, header_rect)
+            surface.blit(header_surface, header_rect)
             
             # Draw leaderboard entries
             for i, entry in enumerate(self.leaderboard[:8]):
@@ -586,58 +1754,107 @@ class Game:
                 difficulty = entry['difficulty'][:4]
                 
                 entry_text = f"{rank:<4} {score:<6} {time_val:<6} {level:<4} {difficulty}"
-                text_surface = self.font.render(entry_text, True, colors['text'])
+                text_surface = self.render_text(entry_text, colors['text'])
                 text_rect = text_surface.get_rect(center=(WIDTH//2, 180 + i * 30))
-                self.screen.blit(text_surface, text_rect)
+                surface.blit(text_surface, text_rect)
         
         # Back instruction
-        back_text = self.font.render("Press ESC to go back", True, colors['accent'])
+        back_text = self.render_text("Press ESC to go back", colors['accent'])
         back_rect = back_text.get_rect(center=(WIDTH//2, HEIGHT - 50))
-        self.screen.blit(back_text, back_rect)
+        surface.blit(back_text, back_rect)
+    
+    def scene_key(self):
+        """Everything a menu screen's foreground depends on; the backdrop and title bob animate on their own."""
+        key = (self.state, self.theme)
+        if self.state == "MENU":
+            return key + (self.menu_selection, self.high_score)
+        if self.state == "SETTINGS":
+            return key + (self.settings_selection, self.difficulty)
+        return key + (tuple((e['score'], e['time'], e['level'], e['difficulty']) for e in self.leaderboard[:8]),)
     
-    def draw_pause_screen(self):
+    def draw_scene(self, now):
+        """Draw a menu screen; returns the rects that changed, or None when the whole screen did.
+        
+        The text and highlights are rendered once per key onto a transparent
+        layer and blitted over the backdrop when it animates. Frames where
+        only the title bobbed repaint just the band it moved in, and after
+        IDLE_FREEZE_SECONDS without input the backdrop holds still, leaving
+        only that band to draw.
+        """
+        key = self.scene_key()
+        backdrop_time = now if now - self.last_input < IDLE_FREEZE_SECONDS else None
+        frame = self.compositor.frame(backdrop_time)
+        title_offset = TITLE_BOB(now) if self.state == "MENU" else 0
+        drawn, self.scene_drawn = self.scene_drawn, (key, frame, title_offset)
+        if drawn == self.scene_drawn:
+            return []
+        
+        if self.scene is None or self.scene[0] != key:
+            surface = self.scene[1] if self.scene is not None else pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+            surface.fill((0, 0, 0, 0))
+            {"MENU": self.draw_menu, "SETTINGS": self.draw_settings, "LEADERBOARD": self.draw_leaderboard}[self.state](surface)
+            self.scene = (key, surface, surface.get_bounding_rect())
+        
+        backdrop = self.compositor.layer('plain', backdrop_time)
+        if drawn is not None and drawn[:2] == (key, frame):
+            band = self.title_rect
+            covered = band.clip(self.scene[2])
+            self.screen.blit(backdrop, band, band)
+            self.screen.blit(self.scene[1], covered, covered)
+            self.title_rect = self.draw_menu_title(title_offset)
+            return [band.union(self.title_rect)]
+        
+        self.screen.blit(backdrop, (0, 0))
+        self.screen.blit(self.scene[1], self.scene[2], self.scene[2])
+        if self.state == "MENU":
+            self.title_rect = self.draw_menu_title(title_offset)
+        return None
+    
+    def get_overlay(self):
+        if self.overlay is None:
+            self.overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+            self.overlay.fill((0, 0, 0, 180))
+        return self.overlay
+    
+    def draw_pause_screen(self, now):
         # Semi-transparent overlay
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.get_overlay(), (0, 0))
         
         colors = THEME_COLORS[self.theme]
         
         # Animated pause text
-        pulse = int(20 * abs(math.sin(time.time() * 2)))
-        pause_text = self.big_font.render("PAUSED", True, colors['accent'])
+        pulse = PAUSE_PULSE(now)
+        pause_text = self.render_text("PAUSED", colors['accent'], big=True)
         pause_rect = pause_text.get_rect(center=(WIDTH//2, HEIGHT//2 - 50))
         self.screen.blit(pause_text, pause_rect)
         
         # Controls
         controls = ["P - Resume", "R - Restart", "ESC - Menu"]
         for i, control in enumerate(controls):
-            control_text = self.font.render(control, True, colors['text'])
+            control_text = self.render_text(control, colors['text'])
             control_rect = control_text.get_rect(center=(WIDTH//2, HEIGHT//2 + 20 + i * 30))
             self.screen.blit(control_text, control_rect)
     
-    def draw_game_over(self):
+    def draw_game_over(self, now):
         # Semi-transparent overlay
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))
-        self.screen.blit(overlay, (0, 0))
+        self.screen.blit(self.get_overlay(), (0, 0))
         
         colors = THEME_COLORS[self.theme]
         
         # Game over text with animation
-        shake = int(3 * math.sin(time.time() * 10))
-        game_over_text = self.big_font.render("GAME OVER", True, (255, 0, 0))
+        shake = GAME_OVER_SHAKE(now)
+        game_over_text = self.render_text("GAME OVER", (255, 0, 0), big=True)
         go_rect = game_over_text.get_rect(center=(WIDTH//2 + shake, HEIGHT//2 - 120))
         self.screen.blit(game_over_text, go_rect)
         
         # New high score check
         if self.score > self.high_score:
-            new_hs_text = self.font.render("🎉 NEW HIGH SCORE! 🎉", True, (255, 255, 0))
+            new_hs_text = self.render_text("🎉 NEW HIGH SCORE! 🎉", (255, 255, 0))
             hs_rect = new_hs_text.get_rect(center=(WIDTH//2, HEIGHT//2 - 80))
             self.screen.blit(new_hs_text, hs_rect)
         
         # Stats
-        time_played = time.time() - self.start_time
+        time_played = now - self.start_time
         accuracy = (self.hits / max(self.bullets_fired, 1)) * 100
         
         stats = [
@@ -651,20 +1868,20 @@ class Game:
         ]
         
         for i, stat in enumerate(stats):
-            text = self.font.render(stat, True, colors['text'])
+            text = self.render_text(stat, colors['text'])
             text_rect = text.get_rect(center=(WIDTH//2, HEIGHT//2 - 40 + i * 25))
             self.screen.blit(text, text_rect)
         
         # Controls
         controls = ["R - Restart", "ESC - Menu"]
         for i, control in enumerate(controls):
-            control_text = self.font.render(control, True, colors['accent'])
+            control_text = self.render_text(control, colors['accent'])
             control_rect = control_text.get_rect(center=(WIDTH//2, HEIGHT//2 + 140 + i * 25))
             self.screen.blit(control_text, control_rect)
     
     def add_to_leaderboard(self):
-        if self.score > 0:
-            time_played = time.time() - self.start_time
+        if self.score > 0 and self.persistence is not None and not self.practice:
+            time_played = self.frame_clock.now - self.start_time
             accuracy = (self.hits / max(self.bullets_fired, 1)) * 100
             
             entry = {
@@ -673,43 +1890,154 @@ class Game:
                 'accuracy': accuracy,
                 'level': self.level,
                 'difficulty': self.difficulty.name,
-                'date': datetime.now().strftime("%Y-%m-%d %H:%M")
+                'date': datetime.now().strftime("%Y-%m-%d %H:%M"),
+                'hits': self.hits,
+                'shots': self.bullets_fired
             }
             
-            self.leaderboard.append(entry)
-            self.leaderboard.sort(key=lambda x: x['score'], reverse=True)
-            self.leaderboard = self.leaderboard[:10]
-            self.save_leaderboard()
+            # The worker writes it; the on-screen top 10 is updated right away
+            self.persistence.add_run(entry)
+            self.leaderboard = sorted(self.leaderboard + [entry], key=lambda e: e['score'], reverse=True)[:10]
     
-    def reset_game(self):
-        # Update high score
+    def finish_recording(self):
+        if self.recorder is None:
+            return
+        
+        replay, self.recorder = self.recorder, None
+        replay.score = self.score
+        replay.ticks = self.ticks
+        replay.level = self.level
+        path = os.path.join(self.record_dir,
+                            f"replay-{datetime.now():%Y%m%d-%H%M%S}-{replay.difficulty.name}-{replay.seed}.sirp")
+        if self.persistence is not None:
+            self.persistence.submit(self.save_replay, replay, path)
+        else:
+            try:
+                self.save_replay(replay, path)
+            except Exception as e:
+                print(f"could not save replay {path}: {e!r}", file=sys.stderr)
+    
+    def save_replay(self, replay, path):
+        """Write the replay to `path`, or to `path` with -2, -3... added if that name is taken."""
+        os.makedirs(self.record_dir, exist_ok=True)
+        base, ext = os.path.splitext(path)
+        n = 1
+        while True:
+            try:
+                with open(path, 'xb') as f:
+                    f.write(replay.to_bytes())
+                return path
+            except FileExistsError:
+                n += 1
+                path = f"{base}-{n}{ext}"
+    
+    def reset_game(self, seed=None):
+        self.finish_recording()
+        
+        # Update high score; the leaderboard row is what persists it
         if self.score > self.high_score:
             self.high_score = self.score
-            self.save_high_score()
         
         # Add to leaderboard
-        self.add_to_leaderboard()
+        if not self.headless:
+            self.add_to_leaderboard()
         
         # Reset game state
         self.score = 0
-        self.start_time = time.time()
+        self.start_time = self.frame_clock.now
         self.bullets_fired = 0
         self.hits = 0
         self.level = 1
-        self.player_x = WIDTH // 2 - 25
-        self.bullets = []
-        self.obstacles = []
+        self.ticks = 0
+        self.player_x = self.prev_player_x = WIDTH // 2 - 25
+        self.pending_actions = 0
+        self.bullets.clear()
+        self.obstacles.clear()
+        if self.particles is not None:
+            self.particles.clear()
         self.obstacle_timer = 0
         self.alien_speed = 1
         self.alien_direction = 1
         self.paused = False
+        
+        # Seed the gameplay stream before anything random happens; seeds wrap to
+        # the 32 bits that replays and snapshots store
+        self.seed = (seed if seed is not None else random.randrange(2**32)) & 0xFFFFFFFF
+        self.rng.seed(self.seed)
         self.create_aliens()
+        
+        if self.record_dir is not None and not self.practice:
+            self.recorder = Replay(self.seed, self.difficulty, self.theme)
+        if self.telemetry is not None:
+            self.telemetry.begin(self.seed, self.difficulty)
+        if self.rewind is not None:
+            self.rewind.clear()
+            self.quicksave = None
+    
+    def snapshot(self):
+        """The complete simulation state between two ticks, as compact bytes.
+        
+        A fixed header of the scalar state, the gameplay RNG, the formation and
+        then the live columns of each entity store. restore() continues the
+        game exactly as if it had never been interrupted; purely cosmetic state
+        (particles, animation times) is not included.
+        """
+        if self.formation is None:
+            raise ValueError("no game in progress: call reset_game() before snapshot()")
+        version, rng_state, _ = self.rng.getstate()  # The rules never use gauss(), so its cache is always empty
+        header = SNAPSHOT_HEADER.pack(SNAPSHOT_VERSION, self.difficulty.value, SNAPSHOT_STATES.index(self.state),
+                                      self.paused, self.score, self.level, self.ticks, self.hits, self.bullets_fired,
+                                      self.obstacle_timer, self.seed, self.alien_speed, self.alien_direction,
+                                      self.player_x, self.prev_player_x)
+        return b''.join((header, RNG_STATE.pack(*rng_state), self.formation.to_bytes(),
+                         self.bullets.dump(), self.aliens.dump(), self.obstacles.dump()))
+    
+    def restore(self, data):
+        """Put the game back in the state captured by snapshot()."""
+        (version, difficulty, state, self.paused, self.score, self.level, self.ticks, self.hits, self.bullets_fired,
+         self.obstacle_timer, self.seed, self.alien_speed, self.alien_direction, self.player_x,
+         self.prev_player_x) = SNAPSHOT_HEADER.unpack_from(data)
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"snapshot format {version} is not supported (expected {SNAPSHOT_VERSION})")
+        self.difficulty = Difficulty(difficulty)
+        self.state = SNAPSHOT_STATES[state]
+        offset = SNAPSHOT_HEADER.size
+        self.rng.setstate((3, RNG_STATE.unpack_from(data, offset), None))
+        self.formation, offset = Formation.from_bytes(data, offset + RNG_STATE.size)
+        offset = self.bullets.load(data, offset)
+        offset = self.aliens.load(data, offset)
+        self.obstacles.load(data, offset)
+        self.pending_actions = 0
+    
+    def rewind_tick(self):
+        """Step back one tick through the rewind buffer; False once it is exhausted."""
+        snapshot = self.rewind.pop()
+        if snapshot is None:
+            return False
+        self.restore(snapshot)
+        return True
     
     def handle_events(self):
-        for event in pygame.event.get():
+        events = pygame.event.get()
+        if self.woken_event is not None:
+            events.insert(0, self.woken_event)
+            self.woken_event = None
+        for event in events:
             if event.type == pygame.QUIT:
                 return False
             
+            if event.type in (pygame.KEYDOWN, pygame.MOUSEBUTTONDOWN):
+                self.last_input = self.frame_clock.now
+            
+            if event.type == pygame.WINDOWEXPOSED:
+                self.scene_drawn = None  # The window contents were lost; repaint the menu
+            
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                if not self.profiler.enabled:
+                    self.profiler = FrameProfiler(show_overlay=False)
+                self.profiler.show_overlay = not self.profiler.show_overlay
+                continue
+            
             if self.state == "MENU":
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_UP:
@@ -737,8 +2065,7 @@ class Game:
                         if self.settings_selection == 0:  # Theme
                             themes = list(Theme)
                             current_idx = themes.index(self.theme)
-                            self.theme = themes[(current_idx + 1) % len(themes)]
-                            self.graffiti = self.generate_graffiti()  # Update graffiti with new theme
+                            self.set_theme(themes[(current_idx + 1) % len(themes)])
                         elif self.settings_selection == 1:  # Difficulty
                             difficulties = list(Difficulty)
                             current_idx = difficulties.index(self.difficulty)
@@ -749,8 +2076,7 @@ class Game:
                         if self.settings_selection == 0:  # Theme
                             themes = list(Theme)
                             current_idx = themes.index(self.theme)
-                            self.theme = themes[(current_idx - 1) % len(themes)]
-                            self.graffiti = self.generate_graffiti()
+                            self.set_theme(themes[(current_idx - 1) % len(themes)])
                         elif self.settings_selection == 1:  # Difficulty
                             difficulties = list(Difficulty)
                             current_idx = difficulties.index(self.difficulty)
@@ -766,21 +2092,22 @@ class Game:
             elif self.state == "PLAYING":
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_SPACE and not self.paused:
-                        self.bullets.append([self.player_x + 22, self.player_y])
-                        self.bullets_fired += 1
+                        self.pending_actions |= INPUT_FIRE
                     elif event.key == pygame.K_p:
-                        self.paused = not self.paused
-                        self.state = "PAUSED" if self.paused else "PLAYING"
+                        self.pending_actions |= INPUT_PAUSE
                     elif event.key == pygame.K_r:
                         self.reset_game()
+                    elif event.key == pygame.K_F5 and self.practice:
+                        self.quicksave = self.snapshot()
+                    elif event.key == pygame.K_F9 and self.quicksave is not None:
+                        self.restore(self.quicksave)
                     elif event.key == pygame.K_ESCAPE:
                         self.state = "MENU"
             
             elif self.state == "PAUSED":
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_p:
-                        self.paused = False
-                        self.state = "PLAYING"
+                        self.pending_actions |= INPUT_PAUSE
                     elif event.key == pygame.K_r:
                         self.reset_game()
                         self.state = "PLAYING"
@@ -792,97 +2119,449 @@ class Game:
                     if event.key == pygame.K_r:
                         self.reset_game()
                         self.state = "PLAYING"
+                    elif event.key == pygame.K_F9 and self.quicksave is not None:
+                        self.restore(self.quicksave)
                     elif event.key == pygame.K_ESCAPE:
                         self.state = "MENU"
         
         return True
     
-    def update(self):
-        if self.state == "PLAYING" and not self.paused:
-            # Player movement
-            keys = pygame.key.get_pressed()
-            if keys[pygame.K_LEFT] and self.player_x > 0:
-                self.player_x -= self.player_speed
-            if keys[pygame.K_RIGHT] and self.player_x < WIDTH - 50:
-                self.player_x += self.player_speed
-            
-            # Update game objects
-            self.update_bullets()
-            self.update_aliens()
-            self.update_obstacles()
-            self.check_collisions()
-            
-            # Check win condition
-            if not self.aliens:
-                self.level += 1
-                self.create_aliens()
-                self.alien_speed += 0.3
+    def fire_bullet(self):
+        self.bullets.add(self.player_x + 22, self.player_y)
+        self.bullets_fired += 1
+        if self.telemetry is not None:
+            self.telemetry.record(self.ticks, 'shot', self.player_x + 25, self.player_y, self.level)
     
-    def draw(self):
-        if self.state == "MENU":
-            self.draw_menu()
-        
-        elif self.state == "SETTINGS":
-            self.draw_settings()
+    def read_input(self):
+        keys = pygame.key.get_pressed()
+        actions = 0
+        if keys[pygame.K_LEFT]:
+            actions |= INPUT_LEFT
+        if keys[pygame.K_RIGHT]:
+            actions |= INPUT_RIGHT
+        return actions
+    
+    def step(self, actions=0):
+        """Advance the simulation by one tick using the given INPUT_* bits.
+        
+        INPUT_PAUSE toggles pause first; paused ticks are recorded but do
+        not simulate.
+        """
+        if self.recorder is not None:
+            self.recorder.record(actions)
+        
+        if self.headless:
+            self.frame_clock.tick()
+        
+        if actions & INPUT_PAUSE:
+            self.paused = not self.paused
+            self.state = "PAUSED" if self.paused else "PLAYING"
+        if self.paused:
+            return
         
-        elif self.state == "LEADERBOARD":
-            self.draw_leaderboard()
+        # Practice mode keeps the state at the start of every tick
+        if self.rewind is not None:
+            self.rewind.push(self.snapshot())
+        
+        self.prev_player_x = self.player_x
+        self.bullets.save_positions()
+        self.aliens.save_positions()
+        self.obstacles.save_positions()
+        
+        if actions & INPUT_FIRE:
+            self.fire_bullet()
+        
+        # Player movement
+        if actions & INPUT_LEFT and self.player_x > 0:
+            self.player_x -= self.player_speed
+        if actions & INPUT_RIGHT and self.player_x < WIDTH - 50:
+            self.player_x += self.player_speed
+        profiler = self.profiler
+        profiler.lap('update.input')
+        
+        # Update game objects
+        self.update_bullets()
+        profiler.lap('update.bullets')
+        self.update_aliens()
+        profiler.lap('update.aliens')
+        self.update_obstacles()
+        profiler.lap('update.obstacles')
+        self.check_collisions()
+        
+        # Check win condition
+        if not self.formation:
+            self.level += 1
+            self.create_aliens()
+            self.alien_speed += 0.3
+            if self.telemetry is not None:
+                self.telemetry.record(self.ticks, 'level', self.player_x + 25, self.player_y, self.level)
+        
+        if self.particles is not None:
+            self.emit_exhaust()
+        
+        self.ticks += 1
+        profiler.lap('update.collisions')
+    
+    def update(self):
+        # Holding Backspace in practice mode plays the game backwards, even out of a game over
+        if (self.rewind is not None and self.state in ["PLAYING", "GAME_OVER"] and
+                pygame.key.get_pressed()[pygame.K_BACKSPACE]):
+            self.rewind_tick()
+            return
         
-        elif self.state in ["PLAYING", "PAUSED"]:
-            colors = THEME_COLORS[self.theme]
-            self.screen.fill(colors['bg'])
-            
-            # Draw graffiti background
-            self.draw_graffiti()
-            
-            # Draw stars
-            for i in range(50):
-                x = (i * 37) % WIDTH
-                y = (i * 23) % HEIGHT
-                brightness = 100 + int(50 * math.sin(time.time() + i * 0.1))
-                star_color = (brightness, brightness, brightness)
-                size = 1 + int(math.sin(time.time() * 2 + i) > 0.7)
-                pygame.draw.circle(self.screen, star_color, (x, y), size)
-            
-            self.draw_player()
-            self.draw_aliens()
-            self.draw_obstacles()
-            self.draw_bullets()
-            self.draw_hud()
+        if self.state in ["PLAYING", "PAUSED"]:
+            actions = self.pending_actions if self.paused else self.read_input() | self.pending_actions
+            self.pending_actions = 0
+            self.step(actions)
+        elif self.recorder is not None:
+            self.finish_recording()  # The game ended or was left for the menu
+    
+    def run_headless(self, inputs=None, max_ticks=100000, seed=None):
+        """Play one game without a window as fast as the CPU allows.
+        
+        `inputs` is either a callable taking the game and returning INPUT_*
+        bits for the next tick, or an iterable of such bits (idle once it is
+        exhausted). Returns a summary of the finished game.
+        """
+        self.reset_game(seed)
+        self.state = "PLAYING"
+        
+        if inputs is None or callable(inputs):
+            policy = inputs
+        else:
+            script = iter(inputs)
+            policy = lambda game: next(script, 0)
+        
+        frames = 0
+        while self.state in ["PLAYING", "PAUSED"] and frames < max_ticks:
+            self.step(policy(self) if policy else 0)
+            frames += 1
+        
+        return {
+            'seed': self.seed,
+            'score': self.score,
+            'level': self.level,
+            'ticks': self.ticks,
+            'hits': self.hits,
+            'shots': self.bullets_fired,
+            'game_over': self.state == "GAME_OVER"
+        }
+    
+    def draw_playing_dirty(self, now):
+        """Draw a PLAYING frame touching only the regions that changed.
+        
+        The backdrop is frozen so it can be restored piecewise. Returns the
+        rects to push to the display, or None when the whole screen was
+        repainted (first frame after entering the PLAYING state).
+        """
+        background = self.compositor.layer('still_stars')
+        profiler = self.profiler
+        
+        full_redraw = self.last_dirty is None
+        if full_redraw:
+            self.screen.blit(background, (0, 0))
+        else:
+            # Erase last frame's entities by restoring the backdrop under them
+            for rect in self.last_dirty:
+                self.screen.blit(background, rect, rect)
+        profiler.lap('draw.background')
+        
+        rects = self.draw_player(now)
+        profiler.lap('draw.player')
+        rects += self.draw_aliens(now)
+        profiler.lap('draw.aliens')
+        rects += self.draw_obstacles()
+        profiler.lap('draw.obstacles')
+        rects += self.draw_bullets()
+        profiler.lap('draw.bullets')
+        rects += self.draw_particles()
+        profiler.lap('draw.particles')
+        rects += self.draw_hud(now)
+        profiler.lap('draw.hud')
+        rects += self.draw_profiler()
+        
+        previous, self.last_dirty = self.last_dirty, rects
+        return None if full_redraw else previous + rects
+    
+    def draw(self):
+        """Draw the current state; returns dirty rects, or None for a full flip."""
+        now = self.frame_clock.now
+        if self.state not in IDLE_STATES or self.profiler.show_overlay:
+            self.scene_drawn = None  # Whatever menu scene is on screen gets painted over
+        
+        if self.state == "PLAYING" and self.dirty_rects:
+            return self.draw_playing_dirty(now)
+        self.last_dirty = None
+        
+        if self.state in IDLE_STATES:
+            rects = self.draw_scene(now)
+            if rects is not None:
+                return rects  # At most the bobbing title changed since last frame
+        
+        elif self.state in ["PLAYING", "PAUSED", "GAME_OVER"]:
+            # Backdrop with graffiti and twinkling stars, frozen once the game is over
+            variant = 'still_stars' if self.state == "GAME_OVER" else 'stars'
+            self.screen.blit(self.compositor.layer(variant, now), (0, 0))
+            self.draw_playfield(now)
             
             if self.state == "PAUSED":
-                self.draw_pause_screen()
+                self.draw_pause_screen(now)
+            elif self.state == "GAME_OVER":
+                self.draw_game_over(now)
         
-        elif self.state == "GAME_OVER":
-            colors = THEME_COLORS[self.theme]
-            self.screen.fill(colors['bg'])
-            self.draw_graffiti()
-            
-            # Draw stars
-            for i in range(50):
-                x = (i * 37) % WIDTH
-                y = (i * 23) % HEIGHT
-                pygame.draw.circle(self.screen, (100, 100, 100), (x, y), 1)
-            
-            self.draw_player()
-            self.draw_aliens()
-            self.draw_obstacles()
-            self.draw_bullets()
-            self.draw_hud()
-            self.draw_game_over()
+        self.profiler.lap('draw.screen')
+        self.draw_profiler()
+    
+    def draw_playfield(self, now):
+        profiler = self.profiler
+        profiler.lap('draw.background')
+        self.draw_player(now)
+        profiler.lap('draw.player')
+        self.draw_aliens(now)
+        profiler.lap('draw.aliens')
+        self.draw_obstacles()
+        profiler.lap('draw.obstacles')
+        self.draw_bullets()
+        profiler.lap('draw.bullets')
+        self.draw_particles()
+        profiler.lap('draw.particles')
+        self.draw_hud(now)
+        profiler.lap('draw.hud')
+    
+    def draw_profiler(self):
+        if not self.profiler.show_overlay:
+            return []
+        # Below the score column of the HUD
+        rect = self.profiler.draw_overlay(self.screen, (10, 130))
+        self.profiler.lap('profiler')
+        return [rect]
     
     def run(self):
         running = True
+        tick_time = 1.0 / TICK_RATE
+        accumulator = 0.0
+        previous = self.frame_clock.tick()
         
         while running:
+            # The one clock sample for this frame: ticks and every animation use it
+            now = self.frame_clock.tick()
+            elapsed = now - previous
+            accumulator += elapsed
+            previous = now
+            self.profiler.begin_frame()
+            
             running = self.handle_events()
-            self.update()
-            self.draw()
-            pygame.display.flip()
-            self.clock.tick(FPS)
-        
+            self.sync_scores()
+            profiler = self.profiler  # F3 may have just switched profiling on
+            profiler.lap('events')
+            
+            # Run as many fixed ticks as real time demands, catching up after slow frames
+            ticks = 0
+            while accumulator >= tick_time and ticks < MAX_CATCH_UP_TICKS:
+                self.update()
+                accumulator -= tick_time
+                ticks += 1
+            if accumulator >= tick_time:
+                accumulator %= tick_time  # Too far behind: drop the backlog instead of spiralling
+            
+            # Particles run on real time, so explosions play out over the game-over screen too
+            if not self.paused:
+                self.particles.update(min(elapsed, MAX_CATCH_UP_TICKS * tick_time))
+            profiler.lap('update.particles')
+            
+            self.interpolation = accumulator / tick_time if self.state == "PLAYING" else 1.0
+            rects = self.draw()
+            if rects is None:
+                pygame.display.flip()
+            else:
+                pygame.display.update(rects)
+            if not self.startup.done:
+                self.startup.mark('first frame')
+                self.startup.done = True
+            profiler.lap('flip')
+            if self.state in IDLE_STATES:
+                # Sleep until input arrives or the menu's next animation step is due; the
+                # event that woke us is kept for handle_events, ahead of anything queued after it
+                if not pygame.event.peek():
+                    event = pygame.event.wait(1000 // IDLE_FPS)
+                    if event.type != pygame.NOEVENT:
+                        self.woken_event = event
+            else:
+                self.clock.tick(self.render_fps)
+            profiler.lap('idle')
+            profiler.end_frame(ticks)
+        
+        self.finish_recording()
+        self.profiler.close()
+        if self.persistence is not None:
+            self.persistence.close()  # Flush queued games and replays before exiting
         pygame.quit()
 
+class Replay:
+    """A recorded game: its seed and settings plus one byte of INPUT_* bits per tick.
+    
+    Stored as a fixed header followed by the zlib-compressed input log, with
+    the final score and tick count kept for verification.
+    """
+    MAGIC = b'SIRP'
+    VERSION = 2  # Bumped whenever the rules change, since older inputs no longer replay the same game
+    HEADER = struct.Struct('<4sBIBBIIIH')  # magic, version, seed, difficulty, theme, inputs, ticks, score, level
+    
+    def __init__(self, seed, difficulty, theme, inputs=b''):
+        self.seed = seed
+        self.difficulty = difficulty
+        self.theme = theme
+        self.inputs = bytearray(inputs)
+        self.ticks = 0
+        self.score = 0
+        self.level = 1
+    
+    def record(self, actions):
+        self.inputs.append(actions)
+    
+    def to_bytes(self):
+        header = self.HEADER.pack(self.MAGIC, self.VERSION, self.seed, self.difficulty.value, self.theme.value,
+                                  len(self.inputs), self.ticks, self.score, self.level)
+        return header + zlib.compress(bytes(self.inputs), 9)
+    
+    @classmethod
+    def from_bytes(cls, data):
+        magic, version, seed, difficulty, theme, length, ticks, score, level = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC:
+            raise ValueError("not a Space Invaders replay")
+        if version != cls.VERSION:
+            raise ValueError(f"replay format {version} was recorded under different rules (expected {cls.VERSION})")
+        
+        inputs = zlib.decompress(data[cls.HEADER.size:])
+        if len(inputs) != length:
+            raise ValueError("truncated replay")
+        
+        replay = cls(seed, Difficulty(difficulty), Theme(theme), inputs)
+        replay.ticks = ticks
+        replay.score = score
+        replay.level = level
+        return replay
+    
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes())
+    
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+    
+    def play(self):
+        """Re-run the game headlessly at full speed and return the finished Game."""
+        game = Game(headless=True)
+        game.difficulty = self.difficulty
+        game.theme = self.theme
+        game.reset_game(self.seed)
+        game.state = "PLAYING"
+        
+        for actions in self.inputs:
+            game.step(actions)
+        return game
+    
+    def verify(self):
+        game = self.play()
+        return game.score == self.score and game.ticks == self.ticks
+
+class RewindBuffer:
+    """Ring buffer of the most recent `capacity` game snapshots; pushing into a full one drops the oldest."""
+    
+    def __init__(self, capacity):
+        self.slots = [None] * capacity
+        self.head = 0  # Where the next snapshot goes
+        self.count = 0
+    
+    def __len__(self):
+        return self.count
+    
+    def push(self, snapshot):
+        self.slots[self.head] = snapshot
+        self.head = (self.head + 1) % len(self.slots)
+        self.count = min(self.count + 1, len(self.slots))
+    
+    def pop(self):
+        """Take back the newest snapshot, or None if there is none."""
+        if not self.count:
+            return None
+        self.head = (self.head - 1) % len(self.slots)
+        self.count -= 1
+        snapshot, self.slots[self.head] = self.slots[self.head], None
+        return snapshot
+    
+    def clear(self):
+        self.slots = [None] * len(self.slots)
+        self.head = self.count = 0
+
+IMPORT_FINISHED = time.perf_counter()
+
 if __name__ == "__main__":
-    game = Game()
-    game.run()
\ No newline at end of file
+    import argparse
+    
+    def seed_arg(text):
+        seed = int(text)
+        if not 0 <= seed < 2**32:
+            raise argparse.ArgumentTypeError(f"seed must be between 0 and {2**32 - 1}")
+        return seed
+    
+    parser = argparse.ArgumentParser(description="Space Invaders Deluxe")
+    parser.add_argument('--headless', action='store_true', help="simulate games without a window")
+    parser.add_argument('--games', type=int, default=1, help="number of headless games to run")
+    parser.add_argument('--max-ticks', type=int, default=100000, help="tick limit per headless game")
+    parser.add_argument('--difficulty', choices=[d.name for d in Difficulty], default=Difficulty.MEDIUM.name)
+    parser.add_argument('--seed', type=seed_arg, help="gameplay seed (headless game i uses seed + i, wrapping at 2**32)")
+    parser.add_argument('--record', metavar='DIR', help="write a replay file per game to DIR")
+    parser.add_argument('--replay', metavar='FILE', help="re-run a replay headlessly and verify it")
+    parser.add_argument('--dirty-rects', action='store_true', help="update only changed screen regions while playing")
+    parser.add_argument('--fps', type=int, default=FPS, help="render rate cap; gameplay speed is unaffected")
+    parser.add_argument('--background-fps', type=int, default=BACKGROUND_FPS,
+                        help="backdrop animation rate (0 freezes it)")
+    parser.add_argument('--profile', action='store_true', help="time each frame phase and show the overlay (F3)")
+    parser.add_argument('--profile-out', metavar='FILE', help="stream per-frame timings to FILE (.csv or .jsonl)")
+    parser.add_argument('--startup-report', action='store_true', help="print a cold-start time breakdown on exit")
+    parser.add_argument('--telemetry', metavar='DIR',
+                        help="stream gameplay events to DIR (summarize with telemetry_report.py)")
+    parser.add_argument('--practice', action='store_true',
+                        help="practice mode: rewind (Backspace), quick save (F5) and load (F9); games are not "
+                             "ranked, recorded or logged")
+    args = parser.parse_args()
+    
+    if args.replay:
+        replay = Replay.load(args.replay)
+        started = time.perf_counter()
+        game = replay.play()
+        elapsed = time.perf_counter() - started
+        ok = game.score == replay.score and game.ticks == replay.ticks
+        print(f"seed={replay.seed} difficulty={replay.difficulty.name} score={game.score}/{replay.score} "
+              f"ticks={game.ticks}/{replay.ticks} {'OK' if ok else 'MISMATCH'} ({elapsed:.2f}s)")
+        sys.exit(0 if ok else 1)
+    
+    telemetry = TelemetryLog(args.telemetry) if args.telemetry else None
+    if args.headless:
+        for i in range(args.games):
+            game = Game(headless=True, record_dir=args.record, telemetry=telemetry)
+            game.difficulty = Difficulty[args.difficulty]
+            started = time.perf_counter()
+            result = game.run_headless(max_ticks=args.max_ticks, seed=None if args.seed is None else args.seed + i)
+            game.finish_recording()
+            elapsed = time.perf_counter() - started
+            print(f"seed={result['seed']} score={result['score']} level={result['level']} ticks={result['ticks']} "
+                  f"({result['ticks'] / max(elapsed, 1e-9):.0f} ticks/s)")
+    else:
+        profiler = None
+        if args.profile or args.profile_out:
+            profiler = FrameProfiler(path=args.profile_out, show_overlay=args.profile)
+        game = Game(dirty_rects=args.dirty_rects, background_fps=args.background_fps, render_fps=args.fps,
+                    record_dir=args.record, profiler=profiler, practice=args.practice, telemetry=telemetry)
+        game.difficulty = Difficulty[args.difficulty]
+        game.run()
+        if game.profiler.enabled:
+            print(game.profiler.report())
+        if args.startup_report:
+            print(game.startup.report())
+    
+    if telemetry is not None:
+        telemetry.close()  # Write out the last game's events
\ No newline at end of file
@@ -0,0 +1,153 @@
+"""Summarize the gameplay telemetry written by `space_invaders_game.py --telemetry DIR`.
+
+Streams the columnar JSON lines one batch at a time, so memory stays flat
+however many events there are, and prints per difficulty: event counts,
+accuracy over game time and by level, and heatmaps of where players die
+and where kills land, e.g.:
+
+    python telemetry_report.py telemetry/ --cell 40 --bucket 30 --npz heatmaps.npz
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+
+import numpy as np
+
+from space_invaders_game import Difficulty, TELEMETRY_EVENTS, TICK_RATE, WIDTH, HEIGHT
+
+HITS = ('kill', 'destroy')  # Events that mean a shot connected
+DEATHS = ('crash', 'invasion')
+SHADES = ' .:-=+*#%@'  # Heatmap density, low to high
+
+class Summary:
+    """Running totals for one difficulty; each batch is folded in and then dropped."""
+    
+    def __init__(self, cell, bucket_ticks):
+        self.cell = cell
+        self.bucket_ticks = bucket_ticks
+        self.games = set()
+        self.counts = np.zeros(len(TELEMETRY_EVENTS), dtype=np.int64)
+        
+        # One (rows, cols) grid of screen cells per event type
+        self.heatmaps = np.zeros((len(TELEMETRY_EVENTS), -(-HEIGHT // cell), -(-WIDTH // cell)), dtype=np.int64)
+        
+        # Shots and hits per game-time bucket and per level, grown as later buckets and levels show up
+        self.shots_by_time = np.zeros(0, dtype=np.int64)
+        self.hits_by_time = np.zeros(0, dtype=np.int64)
+        self.shots_by_level = np.zeros(0, dtype=np.int64)
+        self.hits_by_level = np.zeros(0, dtype=np.int64)
+    
+    @staticmethod
+    def _accumulate(totals, keys):
+        counts = np.bincount(keys, minlength=len(totals)).astype(np.int64)
+        counts[:len(totals)] += totals
+        return counts
+    
+    def add(self, batch):
+        self.games.add(batch['game'])
+        event = np.asarray(batch['event'])
+        tick = np.asarray(batch['tick'], dtype=np.int64)
+        level = np.asarray(batch['level'], dtype=np.int64)
+        col = np.clip(np.asarray(batch['x'], dtype=float) // self.cell, 0, self.heatmaps.shape[2] - 1).astype(np.intp)
+        row = np.clip(np.asarray(batch['y'], dtype=float) // self.cell, 0, self.heatmaps.shape[1] - 1).astype(np.intp)
+        
+        code = np.full(len(event), -1)
+        for i, name in enumerate(TELEMETRY_EVENTS):
+            code[event == name] = i
+        known = code >= 0
+        self.counts += np.bincount(code[known], minlength=len(TELEMETRY_EVENTS))
+        np.add.at(self.heatmaps, (code[known], row[known], col[known]), 1)
+        
+        shots = event == 'shot'
+        hits = np.isin(event, HITS)
+        bucket = tick // self.bucket_ticks
+        self.shots_by_time = self._accumulate(self.shots_by_time, bucket[shots])
+        self.hits_by_time = self._accumulate(self.hits_by_time, bucket[hits])
+        self.shots_by_level = self._accumulate(self.shots_by_level, level[shots])
+        self.hits_by_level = self._accumulate(self.hits_by_level, level[hits])
+    
+    def heatmap(self, *events):
+        return sum(self.heatmaps[TELEMETRY_EVENTS.index(event)] for event in events)
+
+def batches(paths):
+    """Yield every batch in the given files and directories, one line at a time."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, 'telemetry-*.jsonl'))))
+        else:
+            files.append(path)
+    
+    for name in files:
+        with open(name) as f:
+            for number, line in enumerate(f, 1):
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    print(f"{name}:{number}: skipping unreadable batch", file=sys.stderr)  # e.g. a crash mid-write
+
+def accuracy(hits, shots):
+    n = max(len(hits), len(shots))
+    hits = np.pad(hits, (0, n - len(hits)))
+    shots = np.pad(shots, (0, n - len(shots)))
+    return hits, shots, np.divide(hits * 100.0, shots, out=np.full(n, np.nan), where=shots > 0)
+
+def print_curve(title, labels, hits, shots):
+    hits, shots, percent = accuracy(hits, shots)
+    print(f"  {title}")
+    for label, h, s, p in zip(labels, hits, shots, percent):
+        if s:
+            print(f"    {label:>12}  {p:5.1f}%  ({h}/{s})")
+
+def print_heatmap(title, grid):
+    print(f"  {title} ({int(grid.sum())} events, {SHADES[-1]!r} = most)")
+    peak = grid.max()
+    for row in grid:
+        shades = (row * (len(SHADES) - 1) + peak - 1) // peak if peak else np.zeros_like(row)
+        print('    |' + ''.join(SHADES[s] for s in shades) + '|')
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize streamed gameplay telemetry")
+    parser.add_argument('paths', nargs='+', help="telemetry directories or .jsonl files")
+    parser.add_argument('--difficulty', nargs='+', choices=[d.name for d in Difficulty],
+                        default=[d.name for d in Difficulty])
+    parser.add_argument('--cell', type=int, default=40, help="heatmap cell size in pixels")
+    parser.add_argument('--bucket', type=float, default=30, help="accuracy curve bucket in seconds of game time")
+    parser.add_argument('--npz', metavar='FILE', help="also save the heatmaps and curves as NumPy arrays")
+    args = parser.parse_args()
+    
+    bucket_ticks = max(1, int(args.bucket * TICK_RATE))
+    summaries = {name: Summary(args.cell, bucket_ticks) for name in args.difficulty}
+    for batch in batches(args.paths):
+        summary = summaries.get(batch['difficulty'])
+        if summary is not None:
+            summary.add(batch)
+    
+    arrays = {'events': np.array(TELEMETRY_EVENTS), 'cell': args.cell, 'bucket_ticks': bucket_ticks}
+    for name, summary in summaries.items():
+        if not summary.games:
+            continue
+        counts = dict(zip(TELEMETRY_EVENTS, summary.counts.tolist()))
+        shots, hits = counts['shot'], sum(counts[event] for event in HITS)
+        print(f"{name}: {len(summary.games)} games, {int(summary.counts.sum())} events, "
+              f"accuracy {hits / max(shots, 1) * 100:.1f}%")
+        print('  ' + '  '.join(f"{event}={count}" for event, count in counts.items()))
+        
+        labels = [f"{i * args.bucket:.0f}-{(i + 1) * args.bucket:.0f}s" for i in range(len(summary.shots_by_time))]
+        print_curve("Accuracy over game time", labels, summary.hits_by_time, summary.shots_by_time)
+        labels = [f"level {i}" for i in range(len(summary.shots_by_level))]
+        print_curve("Accuracy by level", labels, summary.hits_by_level, summary.shots_by_level)
+        print_heatmap("Deaths", summary.heatmap(*DEATHS))
+        print_heatmap("Kills", summary.heatmap('kill'))
+        
+        arrays[f"{name}_heatmaps"] = summary.heatmaps
+        for curve in ('shots_by_time', 'hits_by_time', 'shots_by_level', 'hits_by_level'):
+            arrays[f"{name}_{curve}"] = getattr(summary, curve)
+    
+    if args.npz:
+        np.savez(args.npz, **arrays)
+
+if __name__ == "__main__":
+    main()
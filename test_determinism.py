@@ -0,0 +1,131 @@
+"""Bit-for-bit regression tests for replays, snapshots and the leaderboard import.
+
+Everything runs headless under the SDL dummy drivers:
+
+    python -m pytest -q test_determinism.py
+"""
+import os
+
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import glob
+import json
+
+import pytest
+
+from balance_sweep import RandomBot, TrackerBot
+from space_invaders_game import Game, Difficulty, LeaderboardStore, Replay
+
+SEEDS = range(6)
+
+def play(game, bot, ticks):
+    for _ in range(ticks):
+        if game.state != "PLAYING":
+            break
+        game.step(bot(game))
+
+@pytest.mark.parametrize('difficulty', list(Difficulty))
+def test_replay_round_trip_verifies(tmp_path, difficulty):
+    for seed in SEEDS:
+        game = Game(headless=True, record_dir=str(tmp_path / str(seed)))
+        game.difficulty = difficulty
+        result = game.run_headless(TrackerBot(seed), max_ticks=3000, seed=seed)
+        game.finish_recording()
+        
+        (path,) = glob.glob(str(tmp_path / str(seed) / '*.sirp'))
+        replay = Replay.load(path)
+        assert Replay.from_bytes(replay.to_bytes()).to_bytes() == replay.to_bytes()
+        assert (replay.seed, replay.difficulty, replay.score, replay.ticks) == (seed, difficulty, result['score'],
+                                                                                 result['ticks'])
+        assert replay.verify()
+
+def test_same_seed_and_inputs_play_the_same_game():
+    for seed in SEEDS:
+        snapshots = []
+        for _ in range(2):
+            game = Game(headless=True)
+            game.run_headless(RandomBot(seed), max_ticks=1500, seed=seed)
+            snapshots.append(game.snapshot())
+        assert snapshots[0] == snapshots[1]
+
+@pytest.mark.parametrize('difficulty', list(Difficulty))
+def test_restore_continues_the_same_game(difficulty):
+    for seed in SEEDS:
+        game = Game(headless=True)
+        game.difficulty = difficulty
+        game.reset_game(seed)
+        game.state = "PLAYING"
+        play(game, TrackerBot(seed), 300)
+        state = game.snapshot()
+        
+        # Restored into a fresh Game, the same inputs must produce the same bytes
+        copy = Game(headless=True)
+        copy.restore(state)
+        assert copy.snapshot() == state
+        for branch in (game, copy):
+            play(branch, RandomBot(seed), 600)
+        assert copy.snapshot() == game.snapshot()
+
+def test_rewind_returns_to_earlier_snapshots():
+    game = Game(headless=True, practice=True)
+    game.reset_game(7)
+    game.state = "PLAYING"
+    bot = TrackerBot(7)
+    history = []
+    for _ in range(120):
+        history.append(game.snapshot())
+        game.step(bot(game))
+    
+    for expected in reversed(history):
+        assert game.rewind_tick()
+        assert game.snapshot() == expected
+
+def test_snapshot_needs_a_game_in_progress():
+    with pytest.raises(ValueError):
+        Game(headless=True).snapshot()
+
+def write_legacy(tmp_path):
+    leaderboard = tmp_path / 'leaderboard.json'
+    high_score = tmp_path / 'high_score.json'
+    leaderboard.write_text(json.dumps([
+        {'score': 300, 'time': 40, 'accuracy': 55.5, 'level': 2, 'difficulty': 'HARD', 'date': '2025-07-15 21:54'},
+        {'score': 120, 'duration': 25, 'hits': 12, 'shots': 30, 'date': '2025-07-14 10:00'}
+    ]))
+    high_score.write_text(json.dumps({'high_score': 900}))
+    return str(leaderboard), str(high_score)
+
+def test_legacy_json_is_imported_once(tmp_path):
+    legacy = write_legacy(tmp_path)
+    db = str(tmp_path / 'leaderboard.db')
+    
+    store = LeaderboardStore(db, *legacy)
+    top = store.top(10)
+    assert [entry['score'] for entry in top] == [300, 120]
+    assert top[0]['difficulty'] == 'HARD' and top[0]['accuracy'] == 55.5
+    assert top[1] == {'score': 120, 'time': 25, 'accuracy': 40.0, 'level': 1, 'difficulty': 'MEDIUM',
+                      'date': '2025-07-14 10:00', 'hits': 12, 'shots': 30}
+    assert store.high_score() == 900
+    store.close()
+    
+    store = LeaderboardStore(db, *legacy)
+    assert len(store) == 2
+    store.close()
+
+def test_interrupted_legacy_import_is_retried(tmp_path, monkeypatch):
+    legacy = write_legacy(tmp_path)
+    db = str(tmp_path / 'leaderboard.db')
+    insert = LeaderboardStore._insert
+    
+    def crash(self, entries):
+        insert(self, entries)
+        raise RuntimeError("crashed mid-import")
+    
+    monkeypatch.setattr(LeaderboardStore, '_insert', crash)
+    with pytest.raises(RuntimeError):
+        LeaderboardStore(db, *legacy)
+    monkeypatch.undo()
+    
+    store = LeaderboardStore(db, *legacy)
+    assert len(store) == 2
+    store.close()